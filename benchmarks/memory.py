@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+"""
+Measure the memory used by a coverage tree, per coverpoint and per bucket.
+
+Trees of identical coverpoints are built with a small and a large cross, and the
+memory allocated while building each is traced. The difference between the two
+gives the memory per bucket, and the remainder the memory per coverpoint. Goals
+are set with apply_goals, so the same script can be run against older trees.
+
+    python benchmarks/memory.py --points 2000
+"""
+
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bucket import Covergroup, Coverpoint, Covertop  # noqa: E402
+
+
+class CrossPoint(Coverpoint):
+    def __init__(self, size: int):
+        self.size = size
+
+    def setup(self, ctx):
+        self.add_axis(name="a", values=list(range(self.size)), description="a")
+        self.add_axis(name="b", values=["x", "y"], description="b")
+        self.add_axis(name="c", values={"lo": [0, 9], "hi": [10, 19]}, description="c")
+        self.add_goal("SKIP", "Ignored bucket", ignore=True)
+        self.add_goal("MANY", "Lots of hits", target=20)
+
+    def apply_goals(self, bucket, goals):
+        if bucket.b == "x" and bucket.c == "hi":
+            return goals.SKIP
+        if bucket.c == "lo":
+            return goals.MANY
+
+    def sample(self, trace):
+        self.bucket.hit(a=trace, b="x", c=trace)
+
+
+def build(points: int, per_group: int, size: int) -> tuple[Covertop, int]:
+    """Build a tree of coverpoints, returning it and the bytes allocated"""
+
+    class Group(Covergroup):
+        def setup(self, ctx):
+            for i in range(per_group):
+                self.add_coverpoint(CrossPoint(size), name=f"point_{i}")
+
+    class Top(Covertop):
+        NAME = "top"
+
+        def setup(self, ctx):
+            for i in range(points // per_group):
+                self.add_covergroup(Group(), name=f"group_{i}")
+
+    gc.collect()
+    tracemalloc.start()
+    top = Top(log=logging.getLogger("benchmark"))
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return top, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--per-group", type=int, default=20)
+    parser.add_argument("--small", type=int, default=1, help="Small axis size")
+    parser.add_argument("--large", type=int, default=64, help="Large axis size")
+    args = parser.parse_args()
+
+    # Only the public API is used, so the same script measures older trees
+    points = args.points // args.per_group * args.per_group
+    results = []
+    for size in (args.small, args.large):
+        top, allocated = build(points, args.per_group, size)
+        # Each coverpoint has size x 2 x 2 buckets
+        results.append((allocated, points * size * 4))
+        del top
+
+    (small, small_buckets), (large, large_buckets) = results
+    per_bucket = (large - small) / (large_buckets - small_buckets)
+    per_point = (small - per_bucket * small_buckets) / points
+    print(f"Coverpoints: {points}")
+    print(f"Bytes per coverpoint: {per_point:.0f}")
+    print(f"Bytes per bucket: {per_bucket:.1f}")
+
+
+if __name__ == "__main__":
+    main()
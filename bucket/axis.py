@@ -2,7 +2,9 @@
 # Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 
 import hashlib
-from functools import lru_cache
+import heapq
+from bisect import bisect_right
+from weakref import WeakValueDictionary
 
 from .common.chain import Link, OpenLink
 from .common.exceptions import BucketException
@@ -37,7 +39,29 @@ class AxisUnrecognisedValue(AxisException):
     pass
 
 
+# Axes shared between coverpoints, see Axis.shared
+_shared_axes: "WeakValueDictionary[tuple, Axis]" = WeakValueDictionary()
+
+
 class Axis:
+    __slots__ = (
+        "name",
+        "description",
+        "enable_other",
+        "other_name",
+        "values",
+        "size",
+        "sha",
+        "value_names",
+        "_name_index",
+        "_other_index",
+        "_exact_index",
+        "_interval_starts",
+        "_interval_owners",
+        "_fast_index",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         name: str,
@@ -58,6 +82,21 @@ class Axis:
             self.size += 1
             self.sha.update(key.encode())
 
+        self._build_classifier()
+
+    def shared(self) -> "Axis":
+        """
+        Get an axis equal to this one which can be shared between coverpoints, as
+        axes are not changed once created. Coverpoints built from the same class
+        then only hold one copy of each axis.
+        """
+        key = (self.name, self.description, self.other_name, self.sha.digest())
+        axis = _shared_axes.setdefault(key, self)
+        if axis is not self and axis.values != self.values:
+            # Values with the same names, but which classify differently
+            return self
+        return axis
+
     def chain(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]:
         start = start or OpenLink(CovDef())
         link = CovDef(axis=1, axis_value=self.size, sha=self.sha)
@@ -118,26 +157,144 @@ class Axis:
 
         return dict(sorted(values_dict.items()))
 
-    @lru_cache(maxsize=128)  # noqa: B019
-    def get_named_value(self, value: str | int):
+    def _build_classifier(self):
         """
-        Retrieve the name of the value/range for a given value
+        Build the lookup tables used to classify values into value indexes.
+
+        Classification follows this priority:
+            1. The string form of the value matches a value name
+            2. The value equals a named value, or falls within a named range
+               (the first match in name order wins)
+            3. 'Other' (if enabled)
+
+        Exact values are held in a hash map, and ranges are flattened into
+        non-overlapping intervals which are searched with bisect.
         """
-        if (value_str := str(value)) in self.values:
-            return value_str
-        else:
-            # Must be named, in a range or 'other'
-            for k, v in self.values.items():
+        self.value_names = list(self.values.keys())
+        self._name_index = {name: i for i, name in enumerate(self.value_names)}
+        self._other_index = (
+            self._name_index[self.other_name] if self.enable_other else None
+        )
+
+        # Map of exact values to the index of the first name with that value
+        self._exact_index = {}
+        ranges = []
+        for i, value in enumerate(self.values.values()):
+            if isinstance(value, list):
+                if value[0] <= value[1]:
+                    ranges.append((value[0], value[1], i))
+            else:
+                try:
+                    self._exact_index.setdefault(value, i)
+                except TypeError:
+                    # Unhashable values can only be matched by a linear search
+                    pass
+
+        # Flatten (possibly overlapping) ranges into sorted interval starts, each
+        # owned by the lowest index of the ranges covering it (or -1 if none)
+        self._interval_starts = []
+        self._interval_owners = []
+        ranges.sort()
+        bounds = sorted({lo for lo, _, _ in ranges} | {hi + 1 for _, hi, _ in ranges})
+        covering = []
+        next_range = 0
+        for bound in bounds:
+            while next_range < len(ranges) and ranges[next_range][0] == bound:
+                _, hi, i = ranges[next_range]
+                heapq.heappush(covering, (i, hi))
+                next_range += 1
+            while covering and covering[0][1] < bound:
+                heapq.heappop(covering)
+            owner = covering[0][0] if covering else -1
+            if not self._interval_owners or self._interval_owners[-1] != owner:
+                self._interval_starts.append(bound)
+                self._interval_owners.append(owner)
+
+        # Fast lookup for int and str values, with the priorities pre-resolved
+        self._fast_index = {}
+        for value, i in self._exact_index.items():
+            if isinstance(value, int | float) and value == value // 1:
+                range_index = self._get_range_index(int(value))
+                if range_index is not None:
+                    i = min(i, range_index)
+            self._fast_index[value] = i
+        for name, i in self._name_index.items():
+            self._fast_index[name] = i
+            try:
+                if str(int(name)) == name:
+                    self._fast_index[int(name)] = i
+            except ValueError:
+                pass
+
+    def _get_range_index(self, value: int):
+        """
+        Retrieve the index of the first range containing value (or None)
+        """
+        pos = bisect_right(self._interval_starts, value) - 1
+        if pos < 0 or (owner := self._interval_owners[pos]) < 0:
+            return None
+        return owner
+
+    def _classify(self, value):
+        """
+        Retrieve the index for any value, not just those of type int or str
+        """
+        if (index := self._name_index.get(str(value))) is not None:
+            return index
+        try:
+            index = self._exact_index.get(value)
+        except TypeError:
+            for i, v in enumerate(self.values.values()):
                 if value == v:
-                    return k
-                elif isinstance(v, list) and isinstance(value, int):
-                    if v[0] <= value <= v[1]:
-                        return k
-
-            # Value not recognised as user defined
-            # If 'other' category has been enabled, then return other name
-            if not self.enable_other:
-                raise AxisUnrecognisedValue(
-                    f'Unrecognised value for axis "{self.name}": {value}',
-                )
-            return self.other_name
+                    return i
+            return None
+        if isinstance(value, int):
+            range_index = self._get_range_index(value)
+            if index is None or (range_index is not None and range_index < index):
+                index = range_index
+        return index
+
+    def get_value_index(self, value) -> int:
+        """
+        Retrieve the index of the value/range for a given value
+        """
+        value_type = type(value)
+        if value_type is int:
+            index = self._fast_index.get(value)
+            if index is None:
+                index = self._get_range_index(value)
+        elif value_type is str:
+            index = self._fast_index.get(value)
+        else:
+            index = self._classify(value)
+
+        if index is None:
+            return self._get_other_index(value)
+        return index
+
+    def _get_other_index(self, value) -> int:
+        """
+        Retrieve the index of 'other' for a value which is not recognised
+        """
+        # If 'other' category has been enabled, then return other index
+        if self._other_index is None:
+            raise AxisUnrecognisedValue(
+                f'Unrecognised value for axis "{self.name}": {value}',
+            )
+        return self._other_index
+
+    def get_value_indexes(self, values) -> list[int]:
+        """
+        Retrieve the index of the value/range for each of the given values
+        """
+        if hasattr(values, "tolist"):
+            # Convert array-like columns (eg. numpy) to native python values
+            values = values.tolist()
+        get_value_index = self.get_value_index
+        return [get_value_index(value) for value in values]
+
+    def get_named_value(self, value):
+        """
+        Retrieve the name of the value/range for a given value
+        """
+        return self.value_names[self.get_value_index(value)]
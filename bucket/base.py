@@ -1,17 +1,60 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
-from typing import Callable
+import logging
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Collection
 
 from .common.chain import Link, OpenLink
 from .link import CovDef, CovRun
+from .triggers import CoverageTriggers
+
+if TYPE_CHECKING:
+    from .rw.flatchain import DefinitionTables
+
+
+# Route value of traces which do not have the route key
+NO_ROUTE = object()
+
+
+def route_value(trace, key: str):
+    """
+    Get the value of a route key from a trace (either an item or an attribute)
+    """
+    if isinstance(trace, dict):
+        return trace.get(key, NO_ROUTE)
+    return getattr(trace, key, NO_ROUTE)
 
 
 class CoverBase:
     NAME: str | None = None
     DESCRIPTION: str = ""
+    TRIGGER: CoverageTriggers = CoverageTriggers.ALL
+    # Only traces whose ROUTE_KEY (item or attribute) is one of ROUTE_VALUES are
+    # passed on to be sampled, if a ROUTE_KEY is set
+    ROUTE_KEY: str | None = None
+    ROUTE_VALUES: Collection = ()
 
     _full_path: str
+    log: logging.Logger
+
+    # Logging is forwarded to the logger, rather than binding its methods to every
+    # coverpoint and covergroup
+    def debug(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 2)
+        self.log.debug(msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 2)
+        self.log.info(msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 2)
+        self.log.warning(msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 2)
+        self.log.error(msg, *args, **kwargs)
 
     def setup(self):
         raise NotImplementedError("This needs to be implemented by the coverpoint")
@@ -19,6 +62,25 @@ class CoverBase:
     def sample(self, trace):
         raise NotImplementedError("This needs to be implemented by the coverpoint")
 
+    def _flush(self):
+        """Finish any pending sampling before coverage is read"""
+
+    @contextmanager
+    def _hold_sampling(self):
+        """
+        Finish any pending sampling, then hold further sampling until the context
+        exits, so that coverage is unchanged while it is read
+        """
+        self._flush()
+        yield
+
+    def _definition_tables(self) -> "DefinitionTables":
+        """Build the definition tables of the coverage below this node"""
+        # Import rw classes here to avoid circular imports
+        from .rw.flatchain import DefinitionTables, FlatChain
+
+        return DefinitionTables(FlatChain(self))
+
     def _chain_def(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]: ...
 
     def _chain_run(self, start: OpenLink[CovRun] | None = None) -> Link[CovRun]: ...
@@ -32,6 +94,29 @@ class CoverBase:
 
     def _set_tier_level(self, tier: int) -> bool: ...
 
+    def _plan_sampling(self, plan: list, route: dict | None = None) -> None: ...
+
+    def _route_accepts(self, trace) -> bool:
+        """Check whether a trace is accepted by the route of this coverpoint/covergroup"""
+        try:
+            return route_value(trace, self.ROUTE_KEY) in self.ROUTE_VALUES
+        except TypeError:
+            # Unhashable values are never in a set of route values
+            return False
+
+    def _route_excluded(self, route: dict | None) -> bool:
+        """
+        Check whether this coverpoint/covergroup is excluded from a sampling plan
+        specialised for a route (the value of each route key)
+        """
+        return (
+            route is not None
+            and self.ROUTE_KEY is not None
+            and route.get(self.ROUTE_KEY, NO_ROUTE) not in self.ROUTE_VALUES
+        )
+
+    def _sampling_saturated(self) -> bool: ...
+
     def print(
         self,
         axes: bool = True,
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 import logging
+from collections import Counter
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -14,9 +15,14 @@ class Bucket:
     See coverpoint.py or example.py for how to use
     """
 
+    # A __dict__ is only created if hit_values is replaced by a compiled function
+    __slots__ = ("parent", "log", "_kinds", "axis_values", "__dict__")
+
     def __init__(self, parent: "Coverpoint", log: logging.Logger):
         self.parent = parent
         self.log = log
+        # Goal behaviour of each bucket, once compiled
+        self._kinds = None
         self.clear()
 
     def __call__(self): ...
@@ -49,34 +55,208 @@ class Bucket:
         assert len(self.axis_values) == len(
             self.parent._axes
         ), "Incorrect number of axes have been set"
-        axis_value_list = []
-        for i, axis in enumerate(self.parent._axes):
+        values = []
+        for axis in self.parent._axes:
             if axis.name in self.axis_values:
-                result = self.parent._axes[i].get_named_value(
-                    self.axis_values[axis.name]
-                )
-                axis_value_list.append(result)
+                values.append(self.axis_values[axis.name])
             else:
                 raise Exception(f"Axis {axis.name} has not been set")
 
-        # make it a tuple, increment cvg_hits
-        axis_value_tuple = tuple(axis_value_list)
+        self.hit_values(*values)
+
+    def hit_values(self, *values):
+        """
+        This function will increment the hit count for the combination of axis values
+        passed in positionally, in the order the axes were added. This bypasses any
+        values set with set_axes(). When the coverage is built with compile_hits set,
+        this is replaced with a function generated for the coverpoint's axes.
+        """
+        bucket_index = 0
+        for axis, stride, value in zip(
+            self.parent._axes, self.parent._axis_strides, values, strict=True
+        ):
+            bucket_index += axis.get_value_index(value) * stride
+
+        self._hit_bucket(bucket_index)
+
+    def _hit_bucket(self, bucket_index: int, hits: int = 1):
+        """
+        Apply the goal for a bucket, and increment its hit count if required
+        """
         # Check for any applied goals
-        bucket_goal = self.parent._get_goal(axis_value_tuple)
+        bucket_goal = self.parent._get_goal(bucket_index)
 
         # If the bucket goal is defined as IGNORE, nothing happens.
         # If the bucket goal is defined as ILLEGAL, an error is printed out
-        # Else the bucket hit count is incremented
-        if bucket_goal.target != 0:
-            self.parent._increment_hit_count(axis_value_tuple)
-        if bucket_goal.target < 0:
-            illegal_str = (
-                f"Illegal bucket '{self.parent._name}.{bucket_goal.name}' hit! "
-                + f"Bucket values: {dict(zip(self.parent._axis_names, list(axis_value_tuple), strict=True))}"
+        # Else the bucket hit count is incremented (unless all buckets are full)
+        target = bucket_goal.target
+        if target > 0:
+            if not self.parent._saturated:
+                self.parent._increment_hit_count(bucket_index, hits, target)
+        elif target < 0:
+            self.parent._increment_hit_count(bucket_index, hits)
+            self._illegal_hit(bucket_index)
+
+    def hit_many(self, **columns):
+        """
+        This function will increment the hit count for many combinations of axis values
+        at once. Each axis is passed a column of values (eg. list, tuple or numpy array),
+        all of which must be the same length. Axes set previously with set_axes() will
+        apply the same value to every combination. Goals are applied as for hit().
+        """
+        lengths = {len(column) for column in columns.values()}
+        assert (
+            len(lengths) <= 1
+        ), "All columns passed to hit_many must be the same length"
+        length = lengths.pop() if lengths else 1
+
+        axis_values = self.axis_values | columns
+        assert len(axis_values) == len(
+            self.parent._axes
+        ), "Incorrect number of axes have been set"
+
+        bucket_indexes = [0] * length
+        for axis, stride in zip(
+            self.parent._axes, self.parent._axis_strides, strict=True
+        ):
+            if axis.name in columns:
+                value_indexes = axis.get_value_indexes(columns[axis.name])
+                bucket_indexes = [
+                    bucket_index + value_index * stride
+                    for bucket_index, value_index in zip(
+                        bucket_indexes, value_indexes, strict=True
+                    )
+                ]
+            elif axis.name in axis_values:
+                offset = axis.get_value_index(axis_values[axis.name]) * stride
+                bucket_indexes = [
+                    bucket_index + offset for bucket_index in bucket_indexes
+                ]
+            else:
+                raise Exception(f"Axis {axis.name} has not been set")
+
+        # Goals are applied once per distinct bucket, rather than once per hit
+        for bucket_index, hits in sorted(Counter(bucket_indexes).items()):
+            self._hit_bucket(bucket_index, hits)
+
+    def _illegal_hit(self, bucket_index: int):
+        """
+        Report that an illegal bucket has been hit
+        """
+        bucket_goal = self.parent._get_goal(bucket_index)
+        illegal_str = (
+            f"Illegal bucket '{self.parent._name}.{bucket_goal.name}' hit! "
+            + f"Bucket values: {self.parent._bucket_axis_values(bucket_index)}"
+        )
+        if self.parent._config.except_on_illegal:
+            raise RuntimeError(illegal_str)
+        self.log.error(illegal_str)
+
+    def _compile(self):
+        """
+        Generate a hit_values function specialised to the parent coverpoint. Axis
+        classification is inlined, and the goal behaviour of each bucket is looked up
+        from a precomputed table:
+            0: Increment the hit count (and the run statistics)
+            1: Ignore
+            2: Increment the hit count and report an illegal hit
+            3: Unresolved, see _resolve_kind
+        """
+        point = self.parent
+        # Buckets whose goal is yet to be resolved are marked as 3
+        goal_kinds = {
+            i: self._goal_kind(goal.target) for i, goal in enumerate(point._goal_list)
+        }
+        self._kinds = bytearray(goal_kinds.get(goal, 3) for goal in point._cvg_goals)
+        namespace = {
+            "hits": point._cvg_hits,
+            "kinds": self._kinds,
+            "resolve_kind": self._resolve_kind,
+            "illegal_hit": self._illegal_hit,
+            "goals": point._cvg_goals,
+            "targets": [goal.target for goal in point._goal_list],
+            "run_stats": point._run_stats,
+            "bucket_filled": point._bucket_filled,
+        }
+
+        args = [f"v{i}" for i in range(len(point._axes))]
+        lines = [f"def hit_values({', '.join(args)}):"]
+        terms = []
+        for i, (axis, stride) in enumerate(
+            zip(point._axes, point._axis_strides, strict=True)
+        ):
+            namespace[f"fast_{i}"] = axis._fast_index
+            namespace[f"classify_{i}"] = axis._classify
+            namespace[f"other_{i}"] = axis._get_other_index
+            lines += [
+                f"    t = type(v{i})",
+                "    if t is int or t is str:",
+                f"        i{i} = fast_{i}.get(v{i})",
+            ]
+            if axis._interval_starts:
+                namespace[f"range_{i}"] = axis._get_range_index
+                lines += [
+                    f"        if i{i} is None and t is int:",
+                    f"            i{i} = range_{i}(v{i})",
+                ]
+            lines += [
+                "    else:",
+                f"        i{i} = classify_{i}(v{i})",
+                f"    if i{i} is None:",
+                f"        i{i} = other_{i}(v{i})",
+            ]
+            terms.append(f"i{i} * {stride}")
+
+        lines += [
+            f"    bucket = {' + '.join(terms) or '0'}",
+            "    kind = kinds[bucket]",
+            "    if kind == 3:",
+            "        kind = resolve_kind(bucket)",
+            "    if kind != 1:",
+            "        count = hits[bucket] + 1",
+            "        hits[bucket] = count",
+        ]
+        if point._changed_buckets is not None:
+            namespace["changed"] = point._changed_buckets.add
+            lines.append("        changed(bucket)")
+        lines += [
+            "        if kind:",
+            "            illegal_hit(bucket)",
+            "        elif count <= (target := targets[goals[bucket]]):",
+            "            run_stats[0] += 1",
+            "            if count == 1:",
+            "                run_stats[1] += 1",
+            "            if count == target:",
+            "                bucket_filled(bucket)",
+        ]
+
+        exec("\n".join(lines), namespace)
+        self.hit_values = namespace["hit_values"]
+
+    def _saturate(self):
+        """
+        Stop counting hits once every target bucket is full, so that only illegal
+        hits are checked
+        """
+        if self._kinds is not None:
+            saturated_kinds = [
+                2 if goal.target < 0 else 1 for goal in self.parent._goal_list
+            ]
+            self._kinds[:] = bytes(
+                map(saturated_kinds.__getitem__, self.parent._cvg_goals)
             )
-            if self.parent._config.except_on_illegal:
-                raise RuntimeError(illegal_str)
-            self.log.error(illegal_str)
+
+    @staticmethod
+    def _goal_kind(target: int):
+        return 1 if target == 0 else 2 if target < 0 else 0
+
+    def _resolve_kind(self, bucket_index: int):
+        """
+        Resolve the goal of a bucket for the compiled hit function
+        """
+        kind = self._goal_kind(self.parent._get_goal(bucket_index).target)
+        self._kinds[bucket_index] = kind
+        return kind
 
     def set_axes(self, **kwargs):
         """
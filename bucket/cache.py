@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .coverpoint import Coverpoint
+
+
+class DefinitionCache:
+    """
+    Stores the resolved goal of each bucket for coverpoints on disk, so that later
+    runs can load them rather than calling apply_goals for every bucket.
+
+    Entries are keyed by the coverpoint class, the apply_goals code, the name,
+    description, axes, goals and goal rules, the attributes set on the coverpoint
+    (eg. constructor parameters, and those set in setup) and the coverage context.
+    Attributes or context values which do not have a consistent repr will prevent
+    the entry from being reused.
+
+    Each entry is a small header followed by the goal index of each bucket, in the
+    same layout as the coverpoint's goal array, so that it can be memory-mapped.
+    """
+
+    MAGIC = b"BKTGOAL2"
+    # Magic, bucket count
+    HEADER = struct.Struct("<8sQ")
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def key(self, point: "Coverpoint") -> str:
+        """
+        Create the cache key for a coverpoint's definition
+        """
+        point_type = type(point)
+        key = hashlib.sha256(
+            f"{point_type.__module__}.{point_type.__qualname__}".encode()
+        )
+        key.update(sys.byteorder.encode())
+        key.update(marshal.dumps(point_type.apply_goals.__code__))
+        key.update(point._init_params.encode())
+        key.update((point._name + point._description).encode())
+        for axis in point._axes:
+            key.update(axis.sha.digest())
+        for goal in point._goal_list:
+            key.update(goal.sha.digest())
+        key.update(repr(point._goal_rules).encode())
+        return key.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.goals"
+
+    def load(self, key: str, bucket_count: int):
+        """
+        Load the goal indexes for a key, as a read-only view of the memory-mapped
+        entry. Returns None if not cached, or if the entry is malformed (eg.
+        truncated), so that it is rebuilt.
+        """
+        try:
+            with self._entry_path(key).open("rb") as f:
+                entry = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        try:
+            magic, count = self.HEADER.unpack_from(entry)
+        except struct.error:
+            return None
+        if (
+            magic != self.MAGIC
+            or count != bucket_count
+            or len(entry) != self.HEADER.size + 2 * count
+        ):
+            return None
+        return memoryview(entry)[self.HEADER.size :].cast("H")
+
+    def store(self, key: str, goals):
+        """
+        Store the goal indexes for a key. The entry is written to a temporary file
+        first, so that runs sharing the cache never see a partially written entry.
+        """
+        header = self.HEADER.pack(self.MAGIC, len(goals))
+        with tempfile.NamedTemporaryFile(dir=self.path, delete=False) as f:
+            f.write(header)
+            f.write(goals.tobytes())
+        os.replace(f.name, self._entry_path(key))
@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from .coverpoint import Coverpoint
+from .rw.flatchain import FlatChain
+from .rw.point import PointReader
+
+if TYPE_CHECKING:
+    from .covertop import Covertop
+
+
+class Checkpointer:
+    """
+    Periodically write coverage to an append-only journal while sampling, so that
+    it is not lost if the simulation crashes. The journal starts with the coverage
+    definition, followed by one line of JSON per checkpoint containing only the
+    buckets (and coverpoint statistics) which changed since the last checkpoint.
+    The goal of each bucket is included, as sparse coverpoints only have bucket
+    goals in the definition for buckets already hit.
+    See rw.CheckpointReader to read the latest state back.
+    """
+
+    def __init__(
+        self,
+        top: "Covertop",
+        path: str | Path,
+        every_samples: int | None = None,
+        every_seconds: float | None = None,
+        context_sha: str = "",
+    ):
+        self.top = top
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.every_samples = every_samples
+        self.every_seconds = every_seconds
+        self.context_sha = context_sha
+
+        self.samples = 0
+        self.next_samples = every_samples
+        self.next_time = perf_counter() + every_seconds if every_seconds else None
+        # (coverpoint, point row, bucket start, goal start), once the definition is
+        # written
+        self.points: list[tuple[Coverpoint, int, int, int]] | None = None
+
+    def sampled(self, count: int):
+        """Count samples, writing a checkpoint if due"""
+        self.samples += count
+        due = False
+        if self.next_samples is not None and self.samples >= self.next_samples:
+            self.next_samples = self.samples + self.every_samples
+            due = True
+        if self.next_time is not None and (now := perf_counter()) >= self.next_time:
+            self.next_time = now + self.every_seconds
+            due = True
+        if due:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Append the buckets changed since the last checkpoint to the journal. The
+        definition is written first, on the first checkpoint only.
+        """
+        self.top._flush()
+        if self.points is None:
+            self._write_definition()
+
+        point_hits = []
+        bucket_hits = []
+        for point, row, bucket_start, goal_start in self.points:
+            changed = point._changed_buckets
+            if changed:
+                point_hits.append([row, *point._run_stats])
+                hits = point._cvg_hits
+                goals = point._cvg_goals
+                bucket_hits += [
+                    [bucket_start + b, hits[b], goal_start + goals[b]]
+                    for b in sorted(changed)
+                ]
+                changed.clear()
+
+        record = {
+            "samples": self.samples,
+            "point_hit": point_hits,
+            "bucket_hit": bucket_hits,
+        }
+        with self.path.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_definition(self):
+        """
+        Start the journal with the coverage definition. It is written to a temporary
+        file first, so a crash never leaves a partial definition.
+        """
+        reading = PointReader(self.context_sha).read(self.top)
+        definition = {
+            "sha": reading.get_def_sha(),
+            "rec_sha": reading.get_rec_sha(),
+            "point": [list(it) for it in reading.iter_points()],
+            "axis": [list(it) for it in reading.iter_axes()],
+            "axis_value": [list(it) for it in reading.iter_axis_values()],
+            "goal": [list(it) for it in reading.iter_goals()],
+            "bucket_goal": [list(it) for it in reading.iter_bucket_goals()],
+        }
+        with tempfile.NamedTemporaryFile("w", dir=self.path.parent, delete=False) as f:
+            f.write(json.dumps(definition) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f.name, self.path)
+
+        chain = FlatChain(self.top)
+        self.points = [
+            (
+                chain.nodes[row],
+                row,
+                reading.points[row].bucket_start,
+                reading.points[row].goal_start,
+            )
+            for row in chain.coverpoints
+        ]
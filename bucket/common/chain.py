@@ -52,6 +52,8 @@ _LinkType = TypeVar("_LinkType", bound=Addable)
 
 
 class OpenLink(Generic[_LinkType]):
+    __slots__ = ("start", "index", "depth")
+
     def __init__(self, start: _LinkType, index: Optional[Index] = None, depth: int = 0):
         self.start = start
         self.index = index or Index()
@@ -82,6 +84,8 @@ class OpenLink(Generic[_LinkType]):
 
 
 class Link(Generic[_LinkType]):
+    __slots__ = ("start", "depth", "index", "item", "end")
+
     def __init__(
         self, open_link: OpenLink[_LinkType], item: Any, typ: Hashable, end: _LinkType
     ):
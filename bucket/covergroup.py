@@ -2,7 +2,6 @@
 # Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 
 import hashlib
-import itertools
 import logging
 from types import NoneType, SimpleNamespace
 from typing import TYPE_CHECKING, Callable, Iterable
@@ -24,6 +23,10 @@ if TYPE_CHECKING:
 class Covergroup(CoverBase):
     """This class groups coverpoints together, and adds them to the hierarchy"""
 
+    # Counts coverage added below this covergroup, so cached definitions can tell
+    # if their tree may have changed
+    _tree_version = 0
+
     def _init(
         self,
         log: logging.Logger,
@@ -38,10 +41,6 @@ class Covergroup(CoverBase):
             description: Description of covergroup
         """
         self.log = log
-        self.debug = log.debug
-        self.info = log.info
-        self.warning = log.warning
-        self.error = log.error
 
         self._config = config
 
@@ -59,7 +58,18 @@ class Covergroup(CoverBase):
         self._active = True
         self._coverpoints = {}
         self._covergroups = {}
+        # Children in the order they are iterated, once sorted
+        self._child_list: list[CoverBase] | None = None
+        # Covergroup this covergroup was added to
+        self._parent: Covergroup | None = None
+        # Number of coverpoints below which still need to be sampled
+        self._unsaturated = 0
         self._sha = hashlib.sha256((self._name + self._description).encode())
+
+        # Children are only sampled at the rate set for the trigger
+        self._trigger_rate = config.trigger_rates.get(self.TRIGGER)
+        if self._trigger_rate is not None:
+            self._rate_should_sample = self._trigger_rate.wrap(self.should_sample)
         self._setup()
 
     def _setup(self):
@@ -88,18 +98,23 @@ class Covergroup(CoverBase):
         """
         Set full_path strings for each child
         """
-        for cp in self._coverpoints.values():
-            cp._full_path = self._full_path + f".{cp._name.lower()}"
-
-        for cg in self._covergroups.values():
-            cg._full_path = self._full_path + f".{cg._name.lower()}"
-            cg._set_full_path_for_children()
+        for node in self._iter_tree():
+            if isinstance(node, Covergroup):
+                for child in node.iter_children():
+                    child._full_path = node._full_path + f".{child._name.lower()}"
 
     def _set_tier_level(self, tier: int):
-        any_children_active = False
-        for child in self.iter_children():
-            any_children_active |= child._set_tier_level(tier)
-        self._tier_active = any_children_active
+        groups = []
+        for node in self._iter_tree():
+            if isinstance(node, Covergroup):
+                groups.append(node)
+            else:
+                node._set_tier_level(tier)
+        # Covergroups are active if any child is, so are set from the bottom up
+        for group in reversed(groups):
+            group._tier_active = any(
+                child._tier_active for child in group.iter_children()
+            )
         return self._tier_active
 
     def _match_by_name(self, names: MatchStrs):
@@ -132,20 +147,25 @@ class Covergroup(CoverBase):
         match_state: bool | None,
         mismatch_state: bool | None,
     ):
-        self._filter_applied = True
-        any_children_active = False
-        if matcher(self):
-            for child in self.iter_children():
-                any_children_active |= child._apply_filter(
-                    lambda _: True, match_state, mismatch_state
-                )
-        else:
-            for child in self.iter_children():
-                any_children_active |= child._apply_filter(
-                    matcher, match_state, mismatch_state
-                )
+        groups = []
+        stack = [(self, matcher)]
+        while stack:
+            node, node_matcher = stack.pop()
+            if isinstance(node, Covergroup):
+                node._filter_applied = True
+                groups.append(node)
+                # Everything below a matching covergroup matches
+                child_matcher = (lambda _: True) if node_matcher(node) else node_matcher
+                stack += [
+                    (child, child_matcher)
+                    for child in reversed(node._sorted_children())
+                ]
+            else:
+                node._apply_filter(node_matcher, match_state, mismatch_state)
 
-        self._active = any_children_active
+        # Covergroups are active if any child is, so are set from the bottom up
+        for group in reversed(groups):
+            group._active = any(child._active for child in group.iter_children())
         return self._active
 
     def add_coverpoint(
@@ -183,6 +203,10 @@ class Covergroup(CoverBase):
         if coverpoint._name in self._coverpoints:
             raise Exception("Coverpoint names must be unique within a covergroup")
         self._coverpoints[coverpoint._name] = coverpoint
+        self._child_list = None
+        coverpoint._parent = self
+        self._count_unsaturated(0 if coverpoint._skip_sampling else 1)
+        self._tree_changed()
 
     def add_covergroup(
         self,
@@ -209,6 +233,10 @@ class Covergroup(CoverBase):
         if covergroup._name in self._covergroups:
             raise Exception("Covergroup names must be unique within a covergroup")
         self._covergroups[covergroup._name] = covergroup
+        self._child_list = None
+        covergroup._parent = self
+        self._count_unsaturated(covergroup._unsaturated)
+        self._tree_changed()
 
     def __getattr__(self, key: str):
         """
@@ -233,56 +261,229 @@ class Covergroup(CoverBase):
             self.info(
                 f"[{fmt_active(self._active)}]({self._tier}) {self._name}: {self._description} -- Tags:{self._tags}"
             )
-        indent += 1
-        indentation = "    " * indent
-        for cp in self._coverpoints.values():
-            self.info(
-                f"[{fmt_active(cp._active)}]({cp._tier}) {indentation}|-- {cp._name}: {cp._description} -- Tags:{cp._tags}"
-            )
 
-        for cg in self._covergroups.values():
+        # Children of each covergroup are printed two levels further in
+        stack = [(child, indent + 1) for child in reversed(self._print_children())]
+        while stack:
+            node, indent = stack.pop()
+            indentation = "    " * indent
             self.info(
-                f"[{fmt_active(cg._active)}]({cg._tier}) {indentation}|-- {cg._name}: {cg._description} -- Tags:{cg._tags}"
+                f"[{fmt_active(node._active)}]({node._tier}) {indentation}|-- {node._name}: {node._description} -- Tags:{node._tags}"
             )
-            cg.print_tree(indent + 1)
+            if isinstance(node, Covergroup):
+                stack += [
+                    (child, indent + 2) for child in reversed(node._print_children())
+                ]
+
+    def _print_children(self) -> list[CoverBase]:
+        """Children in the order they are printed by print_tree"""
+        return [*self._coverpoints.values(), *self._covergroups.values()]
 
     def should_sample(self, trace) -> bool:
         # This function can be optionally overridden by the user to stop the covergroup from
         # passing on the trace data to its children. By default it returns True.
         return True
 
-    def _sample(self, trace):
-        """Call sample for all children if active"""
+    @property
+    def _triggered_should_sample(self) -> Callable:
+        """The should_sample function, only called at the rate set for the trigger"""
+        if self._trigger_rate is None:
+            return self.should_sample
+        return self._rate_should_sample
+
+    def _plan_sampling(self, plan: list, route: dict | None = None):
+        """
+        Add the active children of this covergroup to the sampling plan.
+
+        Each entry in the plan is a pair of (function, skip). Where skip is None,
+        the function is a coverpoint's sample(). Otherwise the function is a guard,
+        such as a covergroup's should_sample(), and skip is the index of the first
+        entry after the guarded children, which sampling jumps to if it returns False.
+
+        Where the plan is specialised for a route (the value of each route key),
+        children whose route is not accepted are left out of the plan. Otherwise
+        their route is checked by a guard.
+        """
+        # Covergroups are entered, then exited once their children have been planned
+        # (marked by the index of their guards), so their guards can skip past them
+        stack = [(self, None)]
+        while stack:
+            node, guard_index = stack.pop()
+            if guard_index is not None:
+                guards = node._plan_guards(route)
+                if len(plan) == guard_index + len(guards):
+                    # No active children, so there's no need to call the guards
+                    del plan[guard_index:]
+                else:
+                    plan[guard_index : guard_index + len(guards)] = [
+                        (guard, len(plan)) for guard in guards
+                    ]
+            elif not isinstance(node, Covergroup):
+                node._plan_sampling(plan, route)
+            elif node._active and not node._route_excluded(route):
+                stack.append((node, len(plan)))
+                plan += [None] * len(node._plan_guards(route))
+                stack += [(child, None) for child in reversed(node._sorted_children())]
+
+    def _plan_guards(self, route: dict | None) -> list[Callable]:
+        """Get the guards of the children of this covergroup in the sampling plan"""
+        guards = []
+        if route is None and self.ROUTE_KEY is not None:
+            guards.append(self._route_accepts)
+        if self._guards_sampling():
+            guards.append(self._triggered_should_sample)
+        return guards
+
+    def _guards_sampling(self) -> bool:
+        """
+        Check whether should_sample needs to be called. It only guards the children
+        if it has been overridden, or the covergroup is only sampled at a reduced rate
+        """
+        return (
+            type(self).should_sample is not Covergroup.should_sample
+            or self._trigger_rate is not None
+        )
+
+    def _sample_batch(self, traces: list, profile: Callable | None = None):
+        """
+        Call sample_batch for all children with the traces which should be sampled.
+        If given, profile wraps each sampling function to record its statistics.
+        """
+        stack = [(self, traces)]
+        while stack:
+            node, traces = stack.pop()
+            if not isinstance(node, Covergroup):
+                node._sample_batch(traces, profile)
+            elif node._active and not node._sampling_saturated():
+                if node.ROUTE_KEY is not None:
+                    traces = [trace for trace in traces if node._route_accepts(trace)]
+                should_sample = node._triggered_should_sample
+                if profile is not None and node._guards_sampling():
+                    should_sample = profile(should_sample)
+                traces = [trace for trace in traces if should_sample(trace)]
+                if traces:
+                    stack += [
+                        (child, traces) for child in reversed(node._sorted_children())
+                    ]
+
+    def _sampling_saturated(self) -> bool:
+        """Check whether none of the children need to be sampled any longer"""
+        return self._unsaturated == 0
+
+    def _tree_changed(self):
+        """
+        Count a change to the tree below this covergroup and those above it, and
+        have any covertops above sample the coverage added
+        """
+        group = self
+        while group is not None:
+            group._tree_version += 1
+            group._coverage_added()
+            group = group._parent
 
-        if self._active and self.should_sample(trace):
-            for child in self.iter_children():
-                child._sample(trace)
+    def _coverage_added(self):
+        """Called when coverage is added to the tree below this covergroup"""
+
+    def _count_unsaturated(self, change: int):
+        """
+        Update the number of coverpoints which still need to be sampled, of this
+        covergroup and those above it
+        """
+        group = self
+        while group is not None:
+            group._unsaturated += change
+            group = group._parent
 
     @validate_call
     def iter_children(self) -> Iterable[CoverBase]:
-        self._coverpoints = dict(sorted(self._coverpoints.items()))
-        self._covergroups = dict(sorted(self._covergroups.items()))
+        yield from self._sorted_children()
 
-        yield from itertools.chain(
-            self._coverpoints.values(), self._covergroups.values()
-        )
+    def _sorted_children(self) -> list[CoverBase]:
+        """
+        Get the children in order (coverpoints then covergroups, each by name). They
+        are only sorted again once a child has been added.
+        """
+        if self._child_list is None:
+            self._coverpoints = dict(sorted(self._coverpoints.items()))
+            self._covergroups = dict(sorted(self._covergroups.items()))
+            self._child_list = [
+                *self._coverpoints.values(),
+                *self._covergroups.values(),
+            ]
+        return self._child_list
+
+    def _iter_tree(self) -> Iterable[CoverBase]:
+        """
+        Iterate over this covergroup and every covergroup and coverpoint below it in
+        pre-order, using a stack rather than recursion so deep trees can be walked
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if isinstance(node, Covergroup):
+                stack += reversed(node._sorted_children())
+
+    def _iter_nodes(self) -> Iterable[CoverBase]:
+        """Iterate over every covergroup and coverpoint below this covergroup"""
+        nodes = self._iter_tree()
+        next(nodes)
+        yield from nodes
+
+    def _iter_coverpoints(self) -> Iterable["Coverpoint"]:
+        """Iterate over every coverpoint below this covergroup"""
+        for node in self._iter_tree():
+            if not isinstance(node, Covergroup):
+                yield node
+
+    def _chain(self, start: OpenLink, chain_point: Callable, group_link: Callable):
+        """
+        Chain through the tree below this covergroup, with a stack of the covergroups
+        open at each point rather than recursion. Each entry holds a covergroup, its
+        open link, the open link for its next child, its last closed child, and an
+        iterator over its remaining children.
+        """
+        open_groups = [
+            [self, start, start.link_down(), None, iter(self.iter_children())]
+        ]
+        while True:
+            entry = open_groups[-1]
+            group, group_start, child_start, child_close, children = entry
+            child = next(children, None)
+            if child is None:
+                close = group_start.close(
+                    group, child=child_close, link=group_link(group), typ=CoverBase
+                )
+                open_groups.pop()
+                if not open_groups:
+                    return close
+                entry = open_groups[-1]
+            elif isinstance(child, Covergroup):
+                open_groups.append(
+                    [
+                        child,
+                        child_start,
+                        child_start.link_down(),
+                        None,
+                        iter(child.iter_children()),
+                    ]
+                )
+                continue
+            else:
+                close = chain_point(child, child_start)
+            entry[2] = close.link_across()
+            entry[3] = close
 
     def _chain_def(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]:
-        start = start or OpenLink(CovDef())
-        child_start = start.link_down()
-        child_close = None
-        for child in self.iter_children():
-            child_close = child._chain_def(child_start)
-            child_start = child_close.link_across()
-        return start.close(
-            self, child=child_close, link=CovDef(point=1, sha=self._sha), typ=CoverBase
+        return self._chain(
+            start or OpenLink(CovDef()),
+            lambda point, start: point._chain_def(start),
+            lambda group: CovDef(point=1, sha=group._sha),
         )
 
     def _chain_run(self, start: OpenLink[CovRun] | None = None) -> Link[CovRun]:
-        start = start or OpenLink(CovRun())
-        child_start = start.link_down()
-        child_close = None
-        for child in self.iter_children():
-            child_close = child._chain_run(child_start)
-            child_start = child_close.link_across()
-        return start.close(self, child=child_close, link=CovRun(point=1), typ=CoverBase)
+        return self._chain(
+            start or OpenLink(CovRun()),
+            lambda point, start: point._chain_run(start),
+            lambda group: CovRun(point=1),
+        )
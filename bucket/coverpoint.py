@@ -4,7 +4,9 @@
 import hashlib
 import itertools
 import logging
-from collections import defaultdict
+import math
+from array import array
+from collections import Counter, defaultdict
 from enum import Enum
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Callable
@@ -21,6 +23,7 @@ from .goal import GoalItem
 from .link import CovDef, CovRun
 
 if TYPE_CHECKING:
+    from .covergroup import Covergroup
     from .covertop import CoverConfig
 
 
@@ -30,10 +33,33 @@ class GOAL(Enum):
     DEFAULT = 10
 
 
+# Goal index of buckets which are yet to be passed to apply_goals
+GOAL_UNRESOLVED = 0xFFFF
+
+
+class SparseGoals(dict):
+    """
+    Goal index of each bucket of a sparse coverpoint, resolved from the goal
+    rules as each bucket is first looked up
+    """
+
+    def __init__(self, resolve: Callable[[int], int]):
+        super().__init__()
+        self.resolve = resolve
+
+    def __missing__(self, bucket: int) -> int:
+        goal_index = self[bucket] = self.resolve(bucket)
+        return goal_index
+
+
 class Coverpoint(CoverBase):
     MOTIVATION = ""
     TIER = 0
     TAGS = []
+    # Sparse coverpoints only store the goals and hits of buckets which are hit, so
+    # can have far more buckets than could be stored. Their goals must be set with
+    # goal rules, rather than apply_goals.
+    SPARSE = False
 
     bucket: Bucket
     """
@@ -68,6 +94,15 @@ class Coverpoint(CoverBase):
                 size=trace['Weight']
             )
 
+    Example 4 (demonstrating hitting a column of values per axis from sample_batch)::
+
+        def sample_batch(self, traces):
+            self.bucket.hit_many(
+                name=[trace['Name'] for trace in traces],
+                age=[trace['Age'] for trace in traces],
+                size=[trace['Weight'] for trace in traces],
+            )
+
     """
 
     def _init(
@@ -79,23 +114,19 @@ class Coverpoint(CoverBase):
         *,
         config: "CoverConfig",
     ):
+        # Attributes set before the coverpoint was added (eg. constructor parameters)
+        given_names = set(vars(self))
         self._active = True
         self._config = config
 
         self.log = log
-        self.debug = log.debug
-        self.info = log.info
-        self.warning = log.warning
-        self.error = log.error
 
         # List of axes used by this coverpoint
         self._axes: list[Axis] = []  # TODO make a dict
-        # Number of hits for each bucket
-        self._cvg_hits = defaultdict(int)
         # Dictionary of defined goals
-        self._goal_dict = {"DEFAULT": GoalItem()}
-        # Dictionary of goals for each bucket
-        self._cvg_goals = {}
+        self._goal_dict = {"DEFAULT": GoalItem.shared()}
+        # List of goal rules, as (goal name, {axis index: value indexes})
+        self._goal_rules = []
         # Instance of Bucket class to increment hit count for a bucket
         self.bucket = Bucket(parent=self, log=log)
 
@@ -103,23 +134,116 @@ class Coverpoint(CoverBase):
         self._tier_active = True
         self._tags = []
 
+        internal_names = set(vars(self)) - given_names
         self._setup()
+        # Attributes set other than by _init (eg. constructor parameters, and those
+        # set in setup), and the context setup was given, identify the definition
+        # in the definition cache
+        self._init_params = None
+        if config.definition_cache and not self.SPARSE:
+            params = sorted(
+                (name, value)
+                for name, value in vars(self).items()
+                if name not in internal_names
+            )
+            context = sorted(vars(CoverageContext.get()).items())
+            self._init_params = repr(params) + repr(context)
         self._name = name or self.NAME or type(self).__name__
         self._description = description if description is not None else self.DESCRIPTION
         self._motivation = motivation if motivation is not None else self.MOTIVATION
 
         self._sha = hashlib.sha256((self._name + self._description).encode())
         self._axis_names = [x.name for x in self._axes]
-        goals = SimpleNamespace(**self._goal_dict)
-        for combination in self._all_axis_value_combinations():
-            bucket = SimpleNamespace(
-                **dict(zip(self._axis_names, combination, strict=True))
-            )
-            if goal := self.apply_goals(bucket, goals):
-                self._cvg_goals[combination] = goal
-            else:
-                goal = self._goal_dict["DEFAULT"]
-            self._sha.update(goal.sha.digest())
+
+        # Buckets are addressed by a mixed-radix integer index built from the
+        # value index on each axis, with the last axis changing most frequently.
+        self._axis_strides = []
+        self._bucket_count = 1
+        for axis in reversed(self._axes):
+            self._axis_strides.insert(0, self._bucket_count)
+            self._bucket_count *= axis.size
+
+        # List of defined goals, indexed by the per-bucket goal array
+        self._goal_list = list(self._goal_dict.values())
+        self._goal_indexes = {id(goal): i for i, goal in enumerate(self._goal_list)}
+        self._goals_namespace = SimpleNamespace(**self._goal_dict)
+
+        # apply_goals is only called if overridden, for buckets not matched by a rule
+        self._resolve_by_apply_goals = (
+            type(self).apply_goals is not Coverpoint.apply_goals
+        )
+        if not (
+            self._resolve_by_apply_goals
+            or self._goal_rules
+            or len(self._goal_dict) == 1
+        ):
+            raise NotImplementedError("This needs to be implemented by the coverpoint")
+
+        if self.SPARSE:
+            assert (
+                not self._resolve_by_apply_goals
+            ), "Sparse coverpoints must set their goals with goal rules"
+            # Goal rules, as (goal index, {axis index: value indexes})
+            self._sparse_rules = [
+                (
+                    self._goal_indexes[id(self._goal_dict[goal_name])],
+                    {i: frozenset(indexes) for i, indexes in axis_indexes.items()},
+                )
+                for goal_name, axis_indexes in self._goal_rules
+            ]
+            # Goal index and number of hits for each bucket which has been hit
+            self._cvg_goals = SparseGoals(self._match_goal_rules)
+            self._cvg_hits = defaultdict(int)
+        else:
+            # Goal index for each bucket
+            unresolved = GOAL_UNRESOLVED if self._resolve_by_apply_goals else 0
+            self._cvg_goals = array("H", [unresolved]) * self._bucket_count
+            for goal_name, axis_indexes in reversed(self._goal_rules):
+                goal_index = self._goal_indexes[id(self._goal_dict[goal_name])]
+                self._apply_goal_rule(goal_index, axis_indexes)
+            # Number of hits for each bucket
+            self._cvg_hits = array("Q", bytes(8 * self._bucket_count))
+
+        # Run statistics, kept up to date as buckets with a target are hit:
+        # [hits (up to the target of each bucket), hit buckets, full buckets]
+        self._run_stats = [0, 0, 0]
+        # Total target and number of buckets with a target, once counted
+        self._target_totals_counted = None
+        # Number of buckets with a target, if tracking saturation
+        self._target_buckets = None
+        # Set once every target bucket has reached its target
+        self._saturated = False
+        # Set if saturated and there are no illegal buckets left to check
+        self._skip_sampling = False
+        # Covergroup this coverpoint was added to
+        self._parent: "Covergroup | None" = None
+        # Buckets hit since the last checkpoint, if checkpointing
+        self._changed_buckets: set[int] | None = (
+            set() if self._config.track_changes else None
+        )
+
+        self._goals_resolved = False
+        self._definition_key = None
+        self._goals_cached = False
+        if (cache := self._config.definition_cache) is not None and not self.SPARSE:
+            self._definition_key = cache.key(self)
+            if (
+                cached := cache.load(self._definition_key, self._bucket_count)
+            ) is not None:
+                self._cvg_goals = cached
+                self._goals_cached = True
+                self._resolve_by_apply_goals = False
+        if not (self._config.lazy_goals or self._config.build_workers > 1):
+            self._resolve_goals()
+
+        if self._config.compile_hits and not self.SPARSE:
+            self.bucket._compile()
+
+        # Sampling functions are only wrapped if sampled at a reduced rate
+        self._trigger_rate = self._config.trigger_rates.get(self.TRIGGER)
+        if self._trigger_rate is not None:
+            self._rate_sample = self._trigger_rate.wrap(self.sample)
+            self._rate_sample_batch = self._trigger_rate.wrap_batch(self.sample_batch)
 
         self.debug(f"Coverpoint created: {self._name}: {self._description}")
 
@@ -173,13 +297,121 @@ class Coverpoint(CoverBase):
             self._active = mismatch_state
         return self._active
 
-    def _sample(self, trace):
+    def _plan_sampling(self, plan: list, route: dict | None = None):
+        """
+        Add this coverpoint to the sampling plan if active, and its route is
+        accepted (see Covergroup._plan_sampling)
+        """
+        if not (self._active and self._tier_active) or self._skip_sampling:
+            return
+        if self._route_excluded(route):
+            return
+        if route is None and self.ROUTE_KEY is not None:
+            plan.append((self._route_accepts, len(plan) + 2))
+        plan.append((self._triggered_sample, None))
+
+    @property
+    def _triggered_sample(self) -> Callable:
+        """The sample function, only called at the rate set for the trigger"""
+        if self._trigger_rate is None:
+            return self.sample
+        return self._rate_sample
+
+    @property
+    def _triggered_sample_batch(self) -> Callable:
+        """The sample_batch function, only called at the rate set for the trigger"""
+        if self._trigger_rate is None:
+            return self.sample_batch
+        return self._rate_sample_batch
+
+    def sample_batch(self, traces: list):
         """
-        Call user defined sample function if active
+        Sample a batch of traces. By default this calls sample() for each trace, but
+        it can be overridden to sample the whole batch at once using bucket.hit_many()
         """
-        if self._active and self._tier_active:
+        for trace in traces:
             self.sample(trace)
 
+    def _sample_batch(self, traces: list, profile: Callable | None = None):
+        """
+        Call user defined sample_batch function if active, wrapped by profile if
+        given to record its statistics
+        """
+        if self._active and self._tier_active and not self._skip_sampling:
+            if self.ROUTE_KEY is not None:
+                traces = [trace for trace in traces if self._route_accepts(trace)]
+            if traces:
+                sample_batch = self._triggered_sample_batch
+                if profile is not None:
+                    sample_batch = profile(sample_batch, batch=True)
+                sample_batch(traces)
+
+    def _sampling_saturated(self) -> bool:
+        """
+        Check whether this coverpoint no longer needs to be sampled
+        """
+        return self._skip_sampling
+
+    def _track_saturation(self):
+        """
+        Count the buckets with a target, so that the coverpoint can be saturated
+        once the number of full buckets reaches it
+        """
+        self._target_buckets = self._target_totals()[1]
+        self._check_saturation()
+
+    def _check_saturation(self):
+        if (
+            self._run_stats[2] == self._target_buckets
+            and self._target_buckets is not None
+            and not self._saturated
+        ):
+            self._saturate()
+
+    def _count_run_stats(self):
+        """
+        Recount the run statistics from the hits of every bucket. This is only
+        required if the hits are replaced, rather than incremented.
+        """
+        # Buckets with unresolved goals have not been hit, so have no target here
+        targets = dict(enumerate(goal.target for goal in self._goal_list))
+        goals = self._cvg_goals
+        hits = hit_buckets = full_buckets = 0
+        for bucket, bucket_hits in self._iter_hits():
+            if bucket_hits and (target := targets.get(goals[bucket], 0)) > 0:
+                hits += min(target, bucket_hits)
+                hit_buckets += 1
+                full_buckets += bucket_hits >= target
+        self._run_stats[:] = [hits, hit_buckets, full_buckets]
+        self._check_saturation()
+
+    def _bucket_filled(self, bucket: int):
+        """
+        Record that a target bucket has reached its target
+        """
+        self._run_stats[2] += 1
+        self._check_saturation()
+
+    def _saturate(self):
+        """
+        Stop counting hits once every target bucket is full. If there are illegal
+        buckets, the coverpoint continues to be sampled to check for illegal hits,
+        otherwise it is taken out of sampling altogether.
+        """
+        self._saturated = True
+        skip_sampling = not any(
+            self._goal_list[goal_index].target < 0
+            for goal_index, goal_buckets in self._goal_counts().items()
+            if goal_buckets
+        )
+        if skip_sampling and not self._skip_sampling and self._parent is not None:
+            self._parent._count_unsaturated(-1)
+        self._skip_sampling = skip_sampling
+        self.bucket._saturate()
+        if self._config.on_saturation is not None:
+            self._config.on_saturation()
+        self.debug(f"Coverpoint saturated: {self._name}")
+
     def _all_axis_value_combinations(self):
         """
         Iterate over all possible axis value combinations
@@ -189,11 +421,31 @@ class Coverpoint(CoverBase):
             axis_values.append(list(axis.values.keys()))
         yield from itertools.product(*axis_values)
 
-    def _increment_hit_count(self, bucket: tuple, hits: int = 1):
+    def _bucket_axis_values(self, bucket: int):
         """
-        Increment hit count for the specified bucket. Default is +1
+        Retrieve the axis value names for the specified bucket index
         """
-        self._cvg_hits[bucket] += hits
+        return {
+            axis.name: axis.value_names[(bucket // stride) % axis.size]
+            for axis, stride in zip(self._axes, self._axis_strides, strict=True)
+        }
+
+    def _increment_hit_count(self, bucket: int, hits: int = 1, target: int = 0):
+        """
+        Increment hit count for the specified bucket index. Default is +1.
+        The run statistics are updated for buckets with a target.
+        """
+        bucket_hits = self._cvg_hits[bucket]
+        self._cvg_hits[bucket] = bucket_hits + hits
+        if self._changed_buckets is not None:
+            self._changed_buckets.add(bucket)
+        if bucket_hits < target:
+            run_stats = self._run_stats
+            run_stats[0] += min(target, bucket_hits + hits) - bucket_hits
+            if not bucket_hits:
+                run_stats[1] += 1
+            if bucket_hits + hits >= target:
+                self._bucket_filled(bucket)
 
     @validate_call
     def add_axis(
@@ -206,7 +458,7 @@ class Coverpoint(CoverBase):
         """
         Add axis with values to process later
         """
-        self._axes.append(Axis(name, values, description, enable_other))
+        self._axes.append(Axis(name, values, description, enable_other).shared())
 
     @validate_call
     def add_goal(
@@ -234,29 +486,250 @@ class Coverpoint(CoverBase):
             # This shouldn't be hardcoded, something that can be overridden would be good
             target = 10
 
-        self._goal_dict[formatted_name] = GoalItem(name, target, description)
+        self._goal_dict[formatted_name] = GoalItem.shared(name, target, description)
+
+    def add_goal_rule(self, goal: str, **axis_matches):
+        """
+        Apply a goal to every bucket whose axis values all match. This is evaluated
+        in bulk across the axes, rather than for each bucket as apply_goals is.
+        Rules are applied in the order they are added, so earlier rules take priority.
+        Any buckets not matched by a rule are passed to apply_goals, if implemented.
+
+        Parameters:
+            goal: Name of the goal to apply
+            axis_matches: For each axis to be matched, one of:
+                - A value name
+                - A list/tuple/set of value names
+                - A slice of the axis values (in name order)
+                - A function which is passed each value name, returning True to match
+              Axes which are not provided match every value.
+        """
+        formatted_goal = goal.upper()
+        assert (
+            formatted_goal in self._goal_dict
+        ), f'Goal "{formatted_goal}" must be added before it is used in a rule'
+
+        axis_indexes = {}
+        for i, axis in enumerate(self._axes):
+            if axis.name not in axis_matches:
+                continue
+            match = axis_matches.pop(axis.name)
+            if isinstance(match, str):
+                match = [match]
+            if isinstance(match, slice):
+                value_indexes = list(range(axis.size))[match]
+            elif callable(match):
+                value_indexes = [
+                    j for j, name in enumerate(axis.value_names) if match(name)
+                ]
+            else:
+                unknown = set(match) - set(axis.value_names)
+                assert (
+                    not unknown
+                ), f'Values {unknown} not defined for axis "{axis.name}"'
+                value_indexes = sorted(axis.value_names.index(name) for name in match)
+            axis_indexes[i] = value_indexes
+
+        assert not axis_matches, f"Axes {list(axis_matches)} not defined for rule"
+        self._goal_rules.append((formatted_goal, axis_indexes))
+
+    def _apply_goal_rule(self, goal_index: int, axis_indexes: dict[int, list[int]]):
+        """
+        Set the goal index for every bucket in the cross of the matched axis values
+        """
+        # Axes after the last matched axis are unconstrained, so each match is a
+        # contiguous block of buckets
+        last_matched = max(axis_indexes, default=-1)
+        block = (
+            self._axis_strides[last_matched]
+            if last_matched >= 0
+            else self._bucket_count
+        )
+        block_goals = array("H", [goal_index]) * block
+
+        offsets = [0]
+        for i in range(last_matched + 1):
+            stride = self._axis_strides[i]
+            value_indexes = axis_indexes.get(i, range(self._axes[i].size))
+            offsets = [offset + j * stride for offset in offsets for j in value_indexes]
+
+        for offset in offsets:
+            self._cvg_goals[offset : offset + block] = block_goals
 
     def apply_goals(self, bucket: SimpleNamespace, goals: SimpleNamespace):
         """
-        If coverpoint goals are defined, this function must be implemented by the coverpoint.
-        If no goals are defined, then 'DEFAULT' will be applied
+        If coverpoint goals are defined, this function must be implemented by the coverpoint
+        (unless goal rules have been added to cover them). If no goals are defined, then
+        'DEFAULT' will be applied.
         See example.py for how to use.
         """
         if len(self._goal_dict) == 1:
             return self._goal_dict["DEFAULT"]
         raise NotImplementedError("This needs to be implemented by the coverpoint")
 
-    def _get_goal(self, bucket: tuple):
+    def _match_goal_rules(self, bucket: int) -> int:
+        """
+        Get the goal index of the first goal rule to match a bucket of a sparse
+        coverpoint
         """
-        Retrieve goal for a given bucket
+        value_indexes = [
+            (bucket // stride) % axis.size
+            for axis, stride in zip(self._axes, self._axis_strides, strict=True)
+        ]
+        for goal_index, axis_indexes in self._sparse_rules:
+            if all(value_indexes[i] in indexes for i, indexes in axis_indexes.items()):
+                return goal_index
+        return 0
+
+    def _resolve_goal(self, bucket: int, combination: tuple | None = None) -> int:
         """
-        if bucket in self._cvg_goals:
-            return self._cvg_goals[bucket]
+        Call apply_goals for a bucket, and store the goal index returned
+        """
+        if combination is None:
+            bucket_values = self._bucket_axis_values(bucket)
         else:
-            return self._goal_dict["DEFAULT"]
+            bucket_values = dict(zip(self._axis_names, combination, strict=True))
+
+        goal_index = 0
+        if goal := self.apply_goals(
+            SimpleNamespace(**bucket_values), self._goals_namespace
+        ):
+            assert (
+                id(goal) in self._goal_indexes
+            ), "apply_goals must return one of the goals defined for this coverpoint"
+            goal_index = self._goal_indexes[id(goal)]
+        self._cvg_goals[bucket] = goal_index
+        return goal_index
+
+    def _resolve_goal_indexes(self):
+        """
+        Call apply_goals for every bucket which is yet to be resolved
+        """
+        goals = self._cvg_goals
+        if not self._resolve_by_apply_goals or GOAL_UNRESOLVED not in goals:
+            return
+        for index, combination in enumerate(self._all_axis_value_combinations()):
+            if goals[index] == GOAL_UNRESOLVED:
+                self._resolve_goal(index, combination)
+
+    def _resolve_goals(self):
+        """
+        Resolve the goal for every bucket, and add them to the definition sha.
+        Unless goals are lazily resolved, this is called when the coverpoint is created.
+        """
+        if self._goals_resolved:
+            return
+
+        if self.SPARSE:
+            # Sparse goals are defined by the goal rules, rather than each bucket
+            goal_digests = [goal.sha.digest() for goal in self._goal_list]
+            self._sha.update(b"sparse")
+            for goal_index, axis_indexes in self._sparse_rules:
+                self._sha.update(goal_digests[goal_index])
+                self._sha.update(
+                    repr(
+                        sorted((i, sorted(v)) for i, v in axis_indexes.items())
+                    ).encode()
+                )
+            self._goals_resolved = True
+            return
+
+        self._resolve_goal_indexes()
+
+        # Hash the goal of each bucket in order, in chunks to limit memory use
+        goal_digests = [goal.sha.digest() for goal in self._goal_list]
+        chunk = 1 << 16
+        for start in range(0, self._bucket_count, chunk):
+            goal_chunk = self._cvg_goals[start : start + chunk]
+            self._sha.update(b"".join(map(goal_digests.__getitem__, goal_chunk)))
+
+        if self._definition_key is not None and not self._goals_cached:
+            self._config.definition_cache.store(self._definition_key, self._cvg_goals)
+
+        self._goals_resolved = True
+
+    def _get_goal(self, bucket: int):
+        """
+        Retrieve goal for a given bucket index
+        """
+        goal_index = self._cvg_goals[bucket]
+        if goal_index == GOAL_UNRESOLVED:
+            goal_index = self._resolve_goal(bucket)
+        return self._goal_list[goal_index]
+
+    def _target_totals(self) -> tuple[int, int]:
+        """
+        Get the total target over all buckets, and the number of buckets with a
+        target. These are counted once goals have been resolved.
+        """
+        if self._target_totals_counted is None:
+            target = 0
+            target_buckets = 0
+            for goal_index, goal_buckets in self._goal_counts().items():
+                goal_target = self._goal_list[goal_index].target
+                if goal_target > 0:
+                    target += goal_target * goal_buckets
+                    target_buckets += goal_buckets
+            self._target_totals_counted = (target, target_buckets)
+        return self._target_totals_counted
+
+    def _goal_counts(self) -> dict[int, int]:
+        """
+        Count the buckets with each goal index. For sparse coverpoints, this is
+        counted from the goal rules without visiting each bucket.
+        """
+        self._resolve_goals()
+        if not self.SPARSE:
+            return Counter(self._cvg_goals)
+
+        # Values of each axis are grouped by which rules they match, so that the
+        # buckets are counted over the combinations of groups
+        axis_groups = []
+        for i, axis in enumerate(self._axes):
+            groups = Counter(
+                frozenset(
+                    rule
+                    for rule, (_, axis_indexes) in enumerate(self._sparse_rules)
+                    if i not in axis_indexes or j in axis_indexes[i]
+                )
+                for j in range(axis.size)
+            )
+            axis_groups.append(list(groups.items()))
+
+        all_rules = frozenset(range(len(self._sparse_rules)))
+        counts = Counter()
+        for combination in itertools.product(*axis_groups):
+            rules = all_rules.intersection(*(rules for rules, _ in combination))
+            goal_index = self._sparse_rules[min(rules)][0] if rules else 0
+            counts[goal_index] += math.prod(size for _, size in combination)
+        return counts
+
+    def _iter_hits(self):
+        """
+        Iterate over the bucket index and hits of each bucket, or only those which
+        have been hit for sparse coverpoints
+        """
+        if self.SPARSE:
+            return sorted(self._cvg_hits.items())
+        return enumerate(self._cvg_hits)
+
+    def _total_hits(self) -> int:
+        """
+        Get the total hits over every bucket
+        """
+        return sum(self._cvg_hits.values() if self.SPARSE else self._cvg_hits)
+
+    def _progress_stats(self) -> tuple[int, int, int, int, int]:
+        """
+        Get the target, hits, target buckets, hit buckets and full buckets
+        """
+        target, target_buckets = self._target_totals()
+        hits, hit_buckets, full_buckets = self._run_stats
+        return target, hits, target_buckets, hit_buckets, full_buckets
 
     def _chain_def(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]:
         start = start or OpenLink(CovDef())
+        self._resolve_goals()
 
         child_start = start.link_down()
         child_close = None
@@ -269,19 +742,10 @@ class Coverpoint(CoverBase):
             child_close = goal.chain(child_start)
             child_start = child_close.link_across()
 
-        buckets = 0
-        target = 0
-        target_buckets = 0
-        for bucket in self._all_axis_value_combinations():
-            bucket_target = self._get_goal(bucket).target
-            if bucket_target > 0:
-                target += bucket_target
-                target_buckets += 1
-            buckets += 1
-
+        target, target_buckets = self._target_totals()
         link = CovDef(
             point=1,
-            bucket=buckets,
+            bucket=self._bucket_count,
             target=target,
             target_buckets=target_buckets,
             sha=self._sha,
@@ -292,26 +756,10 @@ class Coverpoint(CoverBase):
     def _chain_run(self, start: OpenLink[CovRun] | None = None) -> Link[CovRun]:
         start = start or OpenLink(CovRun())
 
-        buckets = 0
-        hits = 0
-        hit_buckets = 0
-        full_buckets = 0
-        for bucket in self._all_axis_value_combinations():
-            bucket_target = self._get_goal(bucket).target
-            bucket_hits = self._cvg_hits[bucket]
-
-            if bucket_target > 0:
-                bucket_hits = min(bucket_target, bucket_hits)
-                if bucket_hits > 0:
-                    hit_buckets += 1
-                    if bucket_hits == bucket_target:
-                        full_buckets += 1
-                    hits += bucket_hits
-            buckets += 1
-
+        hits, hit_buckets, full_buckets = self._run_stats
         link = CovRun(
             point=1,
-            bucket=buckets,
+            bucket=self._bucket_count,
             hits=hits,
             hit_buckets=hit_buckets,
             full_buckets=full_buckets,
@@ -319,16 +767,11 @@ class Coverpoint(CoverBase):
 
         return start.close(self, link=link, typ=CoverBase)
 
-    def _bucket_goals(self):
-        """
-        Get goals for each bucket
-        """
-        for bucket in self._all_axis_value_combinations():
-            yield self._get_goal(bucket).name
-
-    def _bucket_hits(self):
+    def _sparse_buckets(self):
         """
-        Get hits for each bucket
+        Get the bucket index, goal index and hits of each bucket which has been hit,
+        for sparse coverpoints
         """
-        for bucket in self._all_axis_value_combinations():
-            yield self._cvg_hits[bucket]
+        for bucket, hits in self._iter_hits():
+            if hits:
+                yield bucket, self._cvg_goals[bucket], hits
@@ -1,32 +1,111 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 
+import inspect
 import logging
-from dataclasses import dataclass
-from typing import Callable
+import multiprocessing
+import pickle
+import queue
+import threading
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Literal
 
 from pydantic import validate_call
 
-from .base import CoverBase
+from .base import NO_ROUTE, CoverBase, route_value
+from .cache import DefinitionCache
+from .checkpoint import Checkpointer
+from .common.chain import Link, OpenLink
 from .common.types import MatchStrs, TagStrs
 from .covergroup import Covergroup
+from .link import CovDef, CovRun
+from .profile import ProfileStats, ProfileTuple, profiled, profiled_batch
+from .progress import ProgressReport, ProgressReporter, summarise_progress
+from .triggers import DEFAULT_TRIGGER_RATES, CoverageTriggers, SampleRate
+
+if TYPE_CHECKING:
+    from .coverpoint import Coverpoint
+    from .rw.flatchain import DefinitionTables
 
 
 @dataclass
 class CoverConfig:
     except_on_illegal: bool = False
+    compile_hits: bool = False
+    lazy_goals: bool = False
+    build_workers: int = 1
+    definition_cache: DefinitionCache | None = None
+    skip_saturated: bool = False
+    trigger_rates: dict[CoverageTriggers, SampleRate] = field(
+        default_factory=lambda: dict(DEFAULT_TRIGGER_RATES)
+    )
+    # Called when a coverpoint becomes saturated
+    on_saturation: Callable[[], None] | None = None
+    # Record the buckets hit since the last checkpoint
+    track_changes: bool = False
+
+
+# Message asking sampling shards for the hits of their coverpoints, without
+# stopping. Pickled batches of traces never match it.
+_GATHER_HITS = b"gather"
+
+# Coverpoints to be resolved by build workers, which inherit them when forked
+_build_points: list["Coverpoint"] = []
+
+
+def _resolve_build_point(index: int) -> bytes:
+    """Resolve the goals of a coverpoint in a build worker"""
+    point = _build_points[index]
+    point._resolve_goal_indexes()
+    return point._cvg_goals.tobytes()
 
 
 class Covertop(Covergroup):
     """This is for the top of the coverage tree"""
 
+    # Not yet set as coverage is added while the covertop is built (see
+    # _coverage_added)
+    _sample_plan = None
+    _shards = None
+
     def __init__(
         self,
         log: logging.Logger | None = None,
         verbosity: str | int | None = None,
         except_on_illegal: bool = False,
+        compile_hits: bool = False,
+        lazy_goals: bool = False,
+        build_workers: int = 1,
+        definition_cache: str | Path | None = None,
+        background_sampling: bool = False,
+        queue_size: int = 1024,
+        backpressure: Literal["block", "drop", "grow"] = "block",
+        sample_workers: int = 1,
+        shard_batch_size: int = 256,
+        profile: bool = False,
+        profile_interval: int = 1,
+        skip_saturated: bool = False,
+        trigger_rates: dict[CoverageTriggers, SampleRate] | None = None,
+        checkpoint_path: str | Path | None = None,
+        checkpoint_samples: int | None = None,
+        checkpoint_seconds: float | None = None,
+        checkpoint_context_sha: str = "",
     ):
-        self.config = CoverConfig(except_on_illegal=except_on_illegal)
+        self.config = CoverConfig(
+            except_on_illegal=except_on_illegal,
+            compile_hits=compile_hits,
+            lazy_goals=lazy_goals,
+            build_workers=build_workers,
+            definition_cache=(
+                DefinitionCache(definition_cache) if definition_cache else None
+            ),
+            skip_saturated=skip_saturated,
+            trigger_rates=DEFAULT_TRIGGER_RATES | (trigger_rates or {}),
+            track_changes=checkpoint_path is not None,
+        )
 
         if log:
             assert isinstance(
@@ -42,12 +121,631 @@ class Covertop(Covergroup):
                 verbosity = getattr(logging, verbosity)
             self.log.setLevel(verbosity)
         self._init(self.log, config=self.config)
+        self._sample_plan = None
+        self._route_keys = ()
+        self._route_plans = {}
+
+        assert backpressure in (
+            "block",
+            "drop",
+            "grow",
+        ), f"backpressure should be block, drop or grow. Instead got {backpressure}"
+        self._background_sampling = background_sampling
+        self._backpressure = backpressure
+        self._sample_queue = queue.Queue(0 if backpressure == "grow" else queue_size)
+        self._sample_worker = None
+        self._sample_error = None
+        # Held by the sampling worker while sampling, see _hold_sampling
+        self._sample_lock = threading.Lock()
+        # Thread holding sampling, if any
+        self._hold_thread = None
+        # Number of traces discarded as the sample queue was full
+        self.dropped_traces = 0
+        self._reported_drops = 0
+
+        if sample_workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            self.warning("Process forking unavailable, sampling in a single process")
+            sample_workers = 1
+        self._sample_workers = sample_workers
+        self._shard_batch_size = shard_batch_size
+        self._shards = None
+        self._shard_points = None
+        self._shard_nodes = None
+        self._shard_buffer = []
+
+        assert profile_interval > 0, "profile_interval must be 1+"
+        # Sampling statistics for each coverpoint and covergroup, if profiling
+        self._profile: dict[CoverBase, ProfileStats] | None = {} if profile else None
+        self._profile_interval = profile_interval
+        self._progress: ProgressReporter | None = None
+        # Definition tables kept between reads, see _definition_tables
+        self._definition: DefinitionTables | None = None
+        self._definition_version = None
+        self._checkpointer = (
+            Checkpointer(
+                self,
+                checkpoint_path,
+                checkpoint_samples,
+                checkpoint_seconds,
+                checkpoint_context_sha,
+            )
+            if checkpoint_path is not None
+            else None
+        )
+
+        if build_workers > 1 and not lazy_goals:
+            self._resolve_goals_in_parallel(build_workers)
+
+        if skip_saturated:
+            self.config.on_saturation = self._drop_sample_plan
+            for point in self._iter_coverpoints():
+                point._track_saturation()
+
+    def _resolve_goals_in_parallel(self, workers: int):
+        """
+        Resolve coverpoint goals across a pool of worker processes. Workers are
+        forked so that they inherit the coverage tree, and only return the goal
+        index of each bucket. The results are then hashed here, in tree order,
+        so the definition is identical to resolving each coverpoint in turn.
+        """
+        points = list(self._iter_coverpoints())
+        pending = [i for i, point in enumerate(points) if point._resolve_by_apply_goals]
+
+        if pending and "fork" in multiprocessing.get_all_start_methods():
+            _build_points[:] = points
+            try:
+                context = multiprocessing.get_context("fork")
+                with context.Pool(workers) as pool:
+                    chunksize = max(1, len(pending) // (workers * 4))
+                    results = pool.map(_resolve_build_point, pending, chunksize)
+            finally:
+                _build_points.clear()
+
+            for i, goals in zip(pending, results, strict=True):
+                points[i]._cvg_goals[:] = array("H", goals)
+        elif pending:
+            self.warning("Process forking unavailable, building coverage serially")
+
+        for point in points:
+            point._resolve_goals()
+
+    def _build_sample_plan(self):
+        """
+        Flatten the active coverage tree into a plan of sampling calls. This is
+        rebuilt on the next sample after filters or tier levels change, or coverage
+        is added to the tree.
+
+        If any coverpoints or covergroups have a route, a plan is also built for
+        each route (the value of each route key) as traces with it are sampled.
+        """
+        route_values = {}
+        for node in self._iter_nodes():
+            if (
+                self.config.skip_saturated
+                and not isinstance(node, Covergroup)
+                and node._target_buckets is None
+            ):
+                # Coverpoints added since the covertop was built
+                node._track_saturation()
+            if node.ROUTE_KEY is not None:
+                route_values.setdefault(node.ROUTE_KEY, set()).update(node.ROUTE_VALUES)
+        self._route_keys = tuple(
+            (key, frozenset(values)) for key, values in route_values.items()
+        )
+        self._route_plans = {}
+        self._sample_plan = self._plan_sampling_for_route(None)
+
+    def _plan_sampling_for_route(self, route: dict | None) -> tuple:
+        """
+        Build a plan of sampling calls, specialised for a route if provided
+        """
+        plan = []
+        for child in self.iter_children():
+            child._plan_sampling(plan, route)
+
+        if self._profile is not None:
+            plan = [(self._profiled(function), skip) for function, skip in plan]
+        return tuple(plan)
+
+    def _profiled(self, function: Callable, batch: bool = False) -> Callable:
+        """
+        Wrap a sampling function to record its statistics. Sampling functions are
+        bound (perhaps through a trigger) to the coverpoint or covergroup they profile.
+        """
+        stats = self._profile.setdefault(
+            inspect.unwrap(function).__self__, ProfileStats()
+        )
+        if batch:
+            return profiled_batch(function, stats)
+        return profiled(function, stats, self._profile_interval)
+
+    def _route_sample_plan(self, trace) -> tuple:
+        """
+        Look up the sampling plan for the route of a trace. Values which are not
+        accepted by any route share a single plan, and traces with unhashable values
+        use the unrouted plan, which checks each route as it is sampled.
+        """
+        try:
+            route = tuple(
+                value if (value := route_value(trace, key)) in values else NO_ROUTE
+                for key, values in self._route_keys
+            )
+        except TypeError:
+            return self._sample_plan
+        plan = self._route_plans.get(route)
+        if plan is None:
+            route_keys = [key for key, _ in self._route_keys]
+            plan = self._plan_sampling_for_route(dict(zip(route_keys, route)))
+            self._route_plans[route] = plan
+        return plan
 
     def sample(self, trace):
-        """Go through the coverage tree and recursively call sample, passing in trace"""
+        """
+        Go through the coverage tree and call sample, passing in trace. With
+        background sampling, the trace is instead queued for the sampling worker.
+        """
+        if self._background_sampling:
+            self._enqueue(self._sample_trace, trace, 1)
+        else:
+            self._sample_trace(trace)
+
+        if self._checkpointer is not None:
+            self._checkpointer.sampled(1)
+
+    def _sample_trace(self, trace):
+        if self._sample_workers > 1:
+            self._shard_traces([trace])
+            return
+
         processed_trace = self.process_trace(trace)
+
+        if self._sample_plan is None:
+            self._build_sample_plan()
+        if self._route_keys:
+            plan = self._route_sample_plan(processed_trace)
+        else:
+            plan = self._sample_plan
+        plan_len = len(plan)
+        index = 0
+        while index < plan_len:
+            function, skip = plan[index]
+            if skip is None:
+                function(processed_trace)
+            elif not function(processed_trace):
+                index = skip
+                continue
+            index += 1
+
+        if self._progress is not None:
+            self._progress.sampled(1)
+
+    def sample_batch(self, traces: Iterable):
+        """
+        Sample many traces at once. The coverage tree is walked once for the whole
+        batch, with each coverpoint receiving all of the traces it should sample.
+        """
+        traces = list(traces)
+        if self._background_sampling:
+            self._enqueue(self._sample_batch_traces, traces, len(traces))
+        else:
+            self._sample_batch_traces(traces)
+
+        if self._checkpointer is not None:
+            self._checkpointer.sampled(len(traces))
+
+    def _sample_batch_traces(self, traces: Iterable):
+        if self._sample_workers > 1:
+            self._shard_traces(list(traces))
+            return
+
+        processed_traces = [self.process_trace(trace) for trace in traces]
+        profile = self._profiled if self._profile is not None else None
         for child in self.iter_children():
-            child._sample(processed_trace)
+            child._sample_batch(processed_traces, profile)
+
+        if self._progress is not None:
+            self._progress.sampled(len(processed_traces))
+
+    def _shard_traces(self, traces: list):
+        """
+        Buffer traces to be sent to every sampling shard in batches
+        """
+        if self._shards is None:
+            self._start_shards()
+        self._shard_buffer += traces
+        if len(self._shard_buffer) >= self._shard_batch_size:
+            self._send_shard_buffer()
+
+    def _send_shard_buffer(self):
+        """
+        Send buffered traces to every sampling shard, pickling them only once
+        """
+        if self._shard_buffer:
+            message = pickle.dumps(self._shard_buffer, pickle.HIGHEST_PROTOCOL)
+            for _, connection in self._shards:
+                connection.send_bytes(message)
+            self._shard_buffer = []
+
+    def _start_shards(self):
+        """
+        Fork a sampling process for each shard. The children of this covertop are
+        shared out between the shards, balanced by the number of coverpoints.
+        Every shard receives every trace, but only samples its own children.
+        """
+        children = list(self.iter_children())
+        child_points = [
+            list(child._iter_coverpoints())
+            if isinstance(child, Covergroup)
+            else [child]
+            for child in children
+        ]
+
+        loads = [0] * self._sample_workers
+        shard_indexes = [[] for _ in range(self._sample_workers)]
+        for index in sorted(range(len(children)), key=lambda i: -len(child_points[i])):
+            shard = loads.index(min(loads))
+            shard_indexes[shard].append(index)
+            loads[shard] += len(child_points[index])
+
+        context = multiprocessing.get_context("fork")
+        self._shards = []
+        self._shard_points = []
+        self._shard_nodes = []
+        for indexes in shard_indexes:
+            # Keep the tree order within each shard
+            indexes.sort()
+            shard_children = [children[i] for i in indexes]
+            shard_points = [point for i in indexes for point in child_points[i]]
+            shard_nodes = [
+                node
+                for child in shard_children
+                for node in (
+                    child._iter_tree() if isinstance(child, Covergroup) else [child]
+                )
+            ]
+            connection, shard_connection = context.Pipe()
+            process = context.Process(
+                target=self._run_shard,
+                args=(shard_children, shard_points, shard_nodes, shard_connection),
+                name="bucket-shard",
+                daemon=True,
+            )
+            process.start()
+            shard_connection.close()
+            self._shards.append((process, connection))
+            self._shard_points.append(shard_points)
+            self._shard_nodes.append(shard_nodes)
+
+    def _run_shard(
+        self,
+        children: list[CoverBase],
+        points: list["Coverpoint"],
+        nodes: list[CoverBase],
+        connection,
+    ):
+        """
+        Sample batches of traces through the given children until an empty message
+        is received, then return the hits of their coverpoints, the profile of their
+        nodes if profiling, and the first error raised while sampling. The same are
+        returned without stopping when asked to gather hits.
+        """
+        profile = None
+        if self._profile is not None:
+            # Only the statistics recorded by this shard are returned
+            self._profile = {}
+            profile = self._profiled
+        error = None
+        while message := connection.recv_bytes():
+            if message == _GATHER_HITS:
+                self._send_shard_hits(points, nodes, error, connection)
+                error = None
+                continue
+            traces = [self.process_trace(trace) for trace in pickle.loads(message)]
+            for child in children:
+                try:
+                    child._sample_batch(traces, profile)
+                except Exception as child_error:
+                    error = error or child_error
+
+        self._send_shard_hits(points, nodes, error, connection)
+        connection.close()
+
+    def _send_shard_hits(
+        self, points: list["Coverpoint"], nodes: list[CoverBase], error, connection
+    ):
+        """
+        Send the hits of the coverpoints of a shard, the statistics recorded for its
+        nodes since they were last sent, and any error raised
+        """
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(repr(error))
+        profile = None
+        if self._profile is not None:
+            profile = [self._profile.get(node) for node in nodes]
+            self._profile = {}
+        connection.send(([point._cvg_hits for point in points], profile, error))
+
+    def _gather_shards(self, stop: bool = True):
+        """
+        Gather the hits of the coverpoints of the sampling shards. If stopping the
+        shards, they are started again on the next sample, inheriting the gathered
+        hits. Returns the first error raised while sampling, if any.
+        """
+        self._send_shard_buffer()
+        shard_error = None
+        for (process, connection), points, nodes in zip(
+            self._shards, self._shard_points, self._shard_nodes, strict=True
+        ):
+            connection.send_bytes(b"" if stop else _GATHER_HITS)
+            hits, profile, error = connection.recv()
+            if stop:
+                process.join()
+            if profile is not None:
+                for node, stats in zip(nodes, profile, strict=True):
+                    if stats is not None:
+                        self._profile.setdefault(node, ProfileStats()).merge(stats)
+            for point, point_hits in zip(points, hits, strict=True):
+                if point._changed_buckets is not None:
+                    old_hits = point._cvg_hits
+                    point._changed_buckets.update(
+                        bucket
+                        for bucket, new in (
+                            point_hits.items()
+                            if point.SPARSE
+                            else enumerate(point_hits)
+                        )
+                        if old_hits[bucket] != new
+                    )
+                if point.SPARSE:
+                    point._cvg_hits.update(point_hits)
+                else:
+                    point._cvg_hits[:] = point_hits
+                point._count_run_stats()
+            shard_error = shard_error or error
+        if stop:
+            self._shards = None
+            self._shard_points = None
+            self._shard_nodes = None
+        return shard_error
+
+    def _enqueue(self, function: Callable, traces, trace_count: int):
+        """
+        Queue traces for the sampling worker, applying backpressure if the queue
+        is full
+        """
+        if self._sample_worker is None:
+            self._sample_worker = threading.Thread(
+                target=self._sample_worker_loop, name="bucket-sampler", daemon=True
+            )
+            self._sample_worker.start()
+
+        if self._backpressure == "drop":
+            try:
+                self._sample_queue.put_nowait((function, traces))
+            except queue.Full:
+                self.dropped_traces += trace_count
+        elif self._hold_thread == threading.get_ident():
+            # Waiting for space would never end, as sampling is held by this thread
+            try:
+                self._sample_queue.put_nowait((function, traces))
+            except queue.Full:
+                raise RuntimeError(
+                    "The sample queue is full while sampling is held for coverage "
+                    "to be written"
+                ) from None
+        else:
+            self._sample_queue.put((function, traces))
+
+    def _sample_worker_loop(self):
+        """
+        Sample queued traces in order. The first error raised is kept to be
+        raised from flush(), and later traces continue to be sampled.
+        """
+        while True:
+            item = self._sample_queue.get()
+            if item is None:
+                # Stopped by close()
+                self._sample_queue.task_done()
+                return
+            function, traces = item
+            try:
+                with self._sample_lock:
+                    function(traces)
+            except Exception as error:
+                if self._sample_error is None:
+                    self._sample_error = error
+            finally:
+                self._sample_queue.task_done()
+
+    def flush(self):
+        """
+        Wait until every queued trace has been sampled. Any error raised while
+        sampling in the background is raised here. This is called before coverage
+        is read, or before filters and tier levels are changed.
+        """
+        self._sync_samples(stop_shards=True)
+
+    def _sync_samples(self, stop_shards: bool):
+        """
+        Wait until every queued trace has been sampled, and gather the hits of the
+        sampling shards, stopping them only if requested. Coverage is read and
+        checkpointed without stopping the shards, as the coverage tree is unchanged.
+        """
+        error = None
+        if self._sample_worker is not None:
+            self._sample_queue.join()
+            if dropped := self.dropped_traces - self._reported_drops:
+                self.warning(f"{dropped} traces dropped as the sample queue was full")
+                self._reported_drops = self.dropped_traces
+            error, self._sample_error = self._sample_error, None
+        if self._shards is not None:
+            error = error or self._gather_shards(stop_shards)
+        if error is not None:
+            raise error
+
+    def close(self):
+        """
+        Flush the coverage, then stop the background sampling worker. Sampling
+        again afterwards starts a new worker.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._sample_worker is not None:
+                self._sample_queue.put(None)
+                self._sample_worker.join()
+                self._sample_worker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _flush(self):
+        self._sync_samples(stop_shards=False)
+
+    @contextmanager
+    def _hold_sampling(self):
+        """
+        Finish any pending sampling, then stop the sampling worker from sampling
+        traces queued since until the context exits
+        """
+        self._flush()
+        with self._sample_lock:
+            self._hold_thread = threading.get_ident()
+            try:
+                yield
+            finally:
+                self._hold_thread = None
+
+    def _definition_tables(self) -> "DefinitionTables":
+        """
+        The definition tables are built on the first read and kept, as the
+        definition cannot change once the tree is built. They are only rebuilt if
+        coverage has since been added to a covergroup in this tree.
+        """
+        tables = self._definition
+        if tables is None or self._definition_version != self._tree_version:
+            self._definition_version = self._tree_version
+            tables = self._definition = super()._definition_tables()
+        else:
+            self._flush()
+        return tables
+
+    def _chain_def(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]:
+        self._flush()
+        return super()._chain_def(start)
+
+    def _chain_run(self, start: OpenLink[CovRun] | None = None) -> Link[CovRun]:
+        self._flush()
+        return super()._chain_run(start)
+
+    def profile_report(self) -> list[ProfileTuple]:
+        """
+        Report the sampling statistics recorded for each coverpoint and covergroup,
+        ordered by the time spent sampling them. Covergroup statistics are for
+        should_sample, with hits totalled over their coverpoints. Covergroups which
+        don't need to call should_sample have no calls or times. Where only every
+        Nth call is timed, the total time is estimated from the calls timed.
+        """
+        assert self._profile is not None, "Profiling must be enabled on the covertop"
+        self.flush()
+
+        report = []
+        nodes = list(self.iter_children())
+        while nodes:
+            node = nodes.pop()
+            stats = self._profile.get(node, ProfileStats())
+            has_stats = True
+            if isinstance(node, Covergroup):
+                kind = "group"
+                hits = sum(point._total_hits() for point in node._iter_coverpoints())
+                nodes += node.iter_children()
+                has_stats = node in self._profile or node._guards_sampling()
+            else:
+                kind = "point"
+                hits = node._total_hits()
+            report.append(
+                ProfileTuple(
+                    path=node._full_path,
+                    kind=kind,
+                    calls=stats.calls if has_stats else None,
+                    time=stats.estimated_time() if has_stats else None,
+                    max_time=stats.max_time if has_stats else None,
+                    hits=hits,
+                )
+            )
+        return sorted(report, key=lambda row: (-(row.time or 0.0), row.path))
+
+    def report_progress(
+        self,
+        every_samples: int | None = None,
+        every_seconds: float | None = None,
+        callback: Callable[[ProgressReport], None] | None = None,
+        path: str | Path | None = None,
+    ):
+        """
+        Report coverage progress while sampling, every N samples and/or every T
+        seconds. Each report summarises the hits and buckets of every covergroup.
+        Parameters:
+            every_samples: Report after this many samples
+            every_seconds: Report when sampling this long after the last report
+            callback: Function to pass each ProgressReport to
+            path: JSONL file to append each report to
+        If neither callback or path are provided, reports are written to the log.
+        """
+        self._progress = ProgressReporter(
+            self, self.log, every_samples, every_seconds, callback, path
+        )
+        return self
+
+    def progress(self) -> ProgressReport:
+        """
+        Summarise the current coverage progress of every covergroup, without
+        reading the full coverage. Samples are only counted while reporting progress.
+        """
+        if self._progress is not None:
+            return self._progress.report()
+        groups = []
+        summarise_progress(self, groups)
+        return ProgressReport(0, 0.0, groups)
+
+    def checkpoint(self):
+        """
+        Write a checkpoint now, containing the buckets hit since the last one.
+        This requires checkpoint_path to be set when instancing the covertop.
+        """
+        assert (
+            self._checkpointer is not None
+        ), "checkpoint_path must be set on the covertop"
+        self._checkpointer.checkpoint()
+        return self
+
+    def _coverage_added(self):
+        """
+        Rebuild the sampling plan (and any sampling shards, which are forked with the
+        tree) to include coverage added after sampling has started
+        """
+        if self._sample_plan is not None or self._shards is not None:
+            self._reset_sample_plan()
+
+    def _drop_sample_plan(self):
+        """
+        Rebuild the sampling plan on the next sample, without waiting for queued
+        traces (eg. when a coverpoint becomes saturated while sampling)
+        """
+        self._sample_plan = None
+
+    def _reset_sample_plan(self):
+        """
+        Rebuild the sampling plan on the next sample, once queued traces have been
+        sampled with the current one
+        """
+        self.flush()
+        self._sample_plan = None
 
     def process_trace(self, trace):
         """
@@ -71,6 +769,7 @@ class Covertop(Covergroup):
         if not self._filter_applied:
             mismatch_state = False
         self._apply_filter(matcher, True, mismatch_state)
+        self._reset_sample_plan()
         return self
 
     @validate_call
@@ -82,6 +781,7 @@ class Covertop(Covergroup):
             matcher: A function to match against coverpoint/covergroup data
         """
         self._apply_filter(matcher, None, False)
+        self._reset_sample_plan()
         return self
 
     @validate_call
@@ -93,6 +793,7 @@ class Covertop(Covergroup):
             matcher: A function to match against coverpoint/covergroup data
         """
         self._apply_filter(matcher, False, None)
+        self._reset_sample_plan()
         return self
 
     @validate_call
@@ -171,4 +872,5 @@ class Covertop(Covergroup):
             tier: The highest tier level to be set active
         """
         self._set_tier_level(tier)
+        self._reset_sample_plan()
         return self
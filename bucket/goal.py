@@ -2,23 +2,34 @@
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
 import hashlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cache
 
 from .common.chain import Link, OpenLink
 from .link import CovDef
 
 
-@dataclass
+@dataclass(slots=True)
 class GoalItem:
     name: str = "DEFAULT"
     target: int = 10
     description: str = ""
+    sha: "hashlib._Hash" = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.sha = hashlib.sha256(
             (self.name + self.description + str(self.target)).encode()
         )
 
+    @staticmethod
+    @cache
+    def shared(name: str = "DEFAULT", target: int = 10, description: str = ""):
+        """
+        Get a goal which can be shared between coverpoints, as goals are not
+        changed once created
+        """
+        return GoalItem(name, target, description)
+
     def chain(self, start: OpenLink[CovDef] | None = None) -> Link[CovDef]:
         start = start or OpenLink(CovDef())
         link = CovDef(goal=1, sha=self.sha)
@@ -6,7 +6,7 @@ from dataclasses import dataclass, fields
 from typing import Self
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CovDef:
     point: int = 0
     axis: int = 0
@@ -33,7 +33,7 @@ class CovDef:
         return new
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CovRun:
     point: int = 0
     bucket: int = 0
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+
+@dataclass
+class ProfileStats:
+    """Sampling statistics for a coverpoint or covergroup"""
+
+    calls: int = 0
+    timed_calls: int = 0
+    time: float = 0.0
+    max_time: float = 0.0
+
+    def estimated_time(self) -> float:
+        """Total time, scaled up from the calls which were timed"""
+        if not self.timed_calls:
+            return 0.0
+        return self.time * self.calls / self.timed_calls
+
+    def merge(self, other: "ProfileStats"):
+        """Add the statistics recorded elsewhere, such as by a sampling shard"""
+        self.calls += other.calls
+        self.timed_calls += other.timed_calls
+        self.time += other.time
+        self.max_time = max(self.max_time, other.max_time)
+
+
+class ProfileTuple(NamedTuple):
+    path: str
+    kind: str
+    calls: int | None
+    time: float | None
+    max_time: float | None
+    hits: int
+
+
+def profiled(function: Callable, stats: ProfileStats, interval: int = 1) -> Callable:
+    """
+    Wrap a sampling function to record its statistics. Every call is counted,
+    but only every 'interval' calls are timed.
+    """
+
+    def profiled_function(trace):
+        stats.calls += 1
+        if stats.calls % interval:
+            return function(trace)
+
+        start = perf_counter()
+        result = function(trace)
+        elapsed = perf_counter() - start
+
+        stats.timed_calls += 1
+        stats.time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        return result
+
+    return profiled_function
+
+
+def profiled_batch(function: Callable, stats: ProfileStats) -> Callable:
+    """
+    Wrap a batch sampling function to record its statistics. Each batch is timed,
+    and counted as a call for each of its traces, so the longest call recorded is
+    the longest mean time over a batch.
+    """
+
+    def profiled_function(traces):
+        start = perf_counter()
+        result = function(traces)
+        elapsed = perf_counter() - start
+
+        stats.calls += len(traces)
+        stats.timed_calls += len(traces)
+        stats.time += elapsed
+        if traces and elapsed / len(traces) > stats.max_time:
+            stats.max_time = elapsed / len(traces)
+        return result
+
+    return profiled_function
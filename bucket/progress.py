@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import json
+import logging
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+from .covergroup import Covergroup
+
+
+class ProgressTuple(NamedTuple):
+    path: str
+    target: int
+    hits: int
+    target_buckets: int
+    hit_buckets: int
+    full_buckets: int
+
+
+class ProgressReport(NamedTuple):
+    samples: int
+    elapsed: float
+    groups: list[ProgressTuple]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "samples": self.samples,
+                "elapsed": round(self.elapsed, 3),
+                "groups": [group._asdict() for group in self.groups],
+            }
+        )
+
+
+def summarise_progress(group: Covergroup, groups: list[ProgressTuple]) -> list[int]:
+    """
+    Total the progress of the coverpoints below a covergroup, adding a summary for
+    it and each covergroup below it to 'groups'. This only uses the statistics kept
+    by each coverpoint, so is proportional to the number of coverpoints rather than
+    buckets.
+    """
+    covergroups = [node for node in group._iter_tree() if isinstance(node, Covergroup)]
+    # Covergroups are totalled from the bottom up, so their children are done first
+    totals = {}
+    for covergroup in reversed(covergroups):
+        group_totals = [0] * 5
+        for child in covergroup.iter_children():
+            stats = totals[child] if child in totals else child._progress_stats()
+            group_totals = [
+                total + stat for total, stat in zip(group_totals, stats, strict=True)
+            ]
+        totals[covergroup] = group_totals
+    groups += [
+        ProgressTuple(covergroup._full_path, *totals[covergroup])
+        for covergroup in covergroups
+    ]
+    return totals[group]
+
+
+class ProgressReporter:
+    """
+    Periodically report coverage progress while sampling, every N samples and/or
+    every T seconds. Reports are passed to a callback, appended to a JSONL file,
+    or written to the log.
+    """
+
+    def __init__(
+        self,
+        top: Covergroup,
+        log: logging.Logger,
+        every_samples: int | None = None,
+        every_seconds: float | None = None,
+        callback: Callable[[ProgressReport], None] | None = None,
+        path: str | Path | None = None,
+    ):
+        assert (
+            every_samples or every_seconds
+        ), "Progress must be reported every N samples and/or every T seconds"
+        self.top = top
+        self.log = log
+        self.every_samples = every_samples
+        self.every_seconds = every_seconds
+        self.callback = callback
+        self.path = Path(path) if path is not None else None
+
+        self.samples = 0
+        self.start_time = perf_counter()
+        self.next_samples = every_samples
+        self.next_time = self.start_time + every_seconds if every_seconds else None
+
+    def report(self) -> ProgressReport:
+        """Summarise the current progress of every covergroup"""
+        groups = []
+        summarise_progress(self.top, groups)
+        return ProgressReport(self.samples, perf_counter() - self.start_time, groups)
+
+    def sampled(self, count: int):
+        """Count samples, reporting progress if due"""
+        self.samples += count
+        due = False
+        if self.next_samples is not None and self.samples >= self.next_samples:
+            self.next_samples = self.samples + self.every_samples
+            due = True
+        if self.next_time is not None and (now := perf_counter()) >= self.next_time:
+            self.next_time = now + self.every_seconds
+            due = True
+        if due:
+            self.emit(self.report())
+
+    def emit(self, report: ProgressReport):
+        if self.callback is not None:
+            self.callback(report)
+        if self.path is not None:
+            with self.path.open("a") as f:
+                f.write(report.to_json() + "\n")
+        if self.callback is None and self.path is None:
+            for group in report.groups:
+                hit_percent = 100 * group.hits / group.target if group.target else 100
+                self.log.info(
+                    f"Progress after {report.samples} samples: {group.path} "
+                    + f"{hit_percent:.2f}% hits, {group.hit_buckets} hit and "
+                    + f"{group.full_buckets} full of {group.target_buckets} buckets"
+                )
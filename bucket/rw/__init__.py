@@ -1,13 +1,24 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
-from .common import MergeReading
+from .checkpoint import CheckpointReader
+from .common import ColumnarReading, MergeReading
 from .console import ConsoleWriter
 from .html import HTMLWriter
 from .json import JSONWriter
-from .point import PointReader
+from .point import PointReader, StreamingReading
 from .sql import SQLAccessor
 
 assert all(
-    [ConsoleWriter, JSONWriter, HTMLWriter, SQLAccessor, PointReader, MergeReading]
+    [
+        ConsoleWriter,
+        JSONWriter,
+        HTMLWriter,
+        SQLAccessor,
+        PointReader,
+        MergeReading,
+        CheckpointReader,
+        ColumnarReading,
+        StreamingReading,
+    ]
 )
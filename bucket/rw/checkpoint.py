@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import json
+from itertools import accumulate
+from pathlib import Path
+
+from .common import (
+    AxisTuple,
+    AxisValueTuple,
+    BucketGoalTuple,
+    BucketHitTuple,
+    GoalTuple,
+    PointHitTuple,
+    PointTuple,
+    PuppetReading,
+    Reader,
+)
+
+
+class CheckpointReader(Reader):
+    """
+    Read coverage from a checkpoint journal written while sampling (see
+    Covertop checkpoint_path). A partially written final checkpoint, as left by
+    a crash, is ignored.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def read(self, rec_ref: int | None = None):
+        """
+        Read the coverage as of a checkpoint (counting from 1), or the latest
+        complete checkpoint if not provided
+        """
+        lines = self.path.read_text().split("\n")
+        # Anything after the last newline was not completely written
+        lines.pop()
+        if not lines:
+            raise RuntimeError(f"No coverage definition in checkpoint {self.path}")
+        definition = json.loads(lines[0])
+        checkpoints = lines[1:] if rec_ref is None else lines[1 : rec_ref + 1]
+
+        reading = PuppetReading()
+        reading.def_sha = definition["sha"]
+        reading.rec_sha = definition["rec_sha"]
+        reading.points = [PointTuple(*it) for it in definition["point"]]
+        reading.axes = [AxisTuple(*it) for it in definition["axis"]]
+        reading.axis_values = [AxisValueTuple(*it) for it in definition["axis_value"]]
+        reading.goals = [GoalTuple(*it) for it in definition["goal"]]
+        reading.bucket_goals = [
+            BucketGoalTuple(*it) for it in definition["bucket_goal"]
+        ]
+
+        # Later checkpoints replace the hits of the buckets and coverpoints in them.
+        # Buckets of sparse coverpoints are added as they are first hit.
+        bucket_goals = {
+            bucket_goal.start: bucket_goal for bucket_goal in reading.bucket_goals
+        }
+        bucket_hits = dict.fromkeys(bucket_goals, 0)
+        point_stats = {}
+        for line in checkpoints:
+            checkpoint = json.loads(line)
+            for start, hits, goal in checkpoint["bucket_hit"]:
+                if start not in bucket_goals:
+                    bucket_goals[start] = BucketGoalTuple(start, goal)
+                bucket_hits[start] = hits
+            for row, *stats in checkpoint["point_hit"]:
+                point_stats[row] = stats
+        if len(bucket_goals) != len(reading.bucket_goals):
+            reading.bucket_goals = sorted(bucket_goals.values())
+
+        # Covergroup statistics are totalled from the coverpoints in their range.
+        # Each coverpoint occupies a single point index, which no other coverpoint
+        # starts at, so covergroups are totalled with a running sum over them.
+        point_end = reading.points[0].end if reading.points else 0
+        point_totals = [[0, 0, 0] for _ in range(point_end)]
+        for row, stats in point_stats.items():
+            point_totals[reading.points[row].start] = stats
+        running = [
+            [0, 0, 0],
+            *accumulate(
+                point_totals, lambda a, b: [x + y for x, y in zip(a, b, strict=True)]
+            ),
+        ]
+        for point in reading.points:
+            stats = [
+                end - start
+                for start, end in zip(
+                    running[point.start], running[point.end], strict=True
+                )
+            ]
+            reading.point_hits.append(PointHitTuple(point.start, point.depth, *stats))
+
+        reading.bucket_hits = [
+            BucketHitTuple(bucket_goal.start, bucket_hits[bucket_goal.start])
+            for bucket_goal in reading.bucket_goals
+        ]
+        return reading
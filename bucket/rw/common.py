@@ -1,7 +1,14 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
-from typing import Any, Iterable, NamedTuple, Protocol
+import gc
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from itertools import islice
+from operator import attrgetter
+from typing import Any, ContextManager, Iterable, NamedTuple, Protocol, Sequence
 
 from ..common.chain import Link
 from ..link import CovDef, CovRun
@@ -152,6 +159,13 @@ class Reading(Protocol):
         self, start: int = 0, end: int | None = None
     ) -> Iterable[BucketHitTuple]: ...
 
+    def hold(self) -> ContextManager:
+        """
+        Hold the coverage the reading is read from unchanged while it is written.
+        Readings which store their tables have nothing to hold.
+        """
+        return nullcontext()
+
 
 class Reader(Protocol):
     """
@@ -174,6 +188,62 @@ class Writer(Protocol):
 ###############################################################################
 
 
+@contextmanager
+def paused_gc():
+    """
+    Pause garbage collection while building the tuples of a reading. Readings of
+    large models hold millions of tuples which cannot form reference cycles, yet
+    collections triggered while they are built repeatedly scan every one so far.
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+# Number of rows writers hold at once
+CHUNK_ROWS = 10000
+
+
+def iter_chunks(rows: Iterable, size: int = CHUNK_ROWS) -> Iterable[list]:
+    """
+    Split rows into lists of up to size rows, so writers only hold a chunk of a
+    table at once. Rows may be generated as they are iterated, so collection is
+    paused while each chunk is built (see paused_gc).
+    """
+    rows = iter(rows)
+    while True:
+        with paused_gc():
+            chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def tuples_from_columns(typ: type, *columns: Iterable) -> list:
+    """
+    Build named tuples of a type from columns of their fields. This skips the
+    argument handling of the named tuple constructor, which dominates the time
+    taken to build a tuple for every bucket.
+    """
+    return list(map(partial(tuple.__new__, typ), zip(*columns)))
+
+
+def bucket_range(rows: Sequence, start: int = 0, end: int | None = None):
+    """
+    Get the rows (ordered by bucket start) for buckets from start up to end. Buckets
+    of sparse coverpoints only have rows if they were hit, so rows are found by
+    their bucket start rather than position.
+    """
+    first = bisect_left(rows, start, key=attrgetter("start"))
+    if end is None:
+        return rows[first:]
+    return rows[first : bisect_left(rows, end, lo=first, key=attrgetter("start"))]
+
+
 class PuppetReading(Reading):
     """
     Utility reading which stores coverage information directly rather than
@@ -211,7 +281,7 @@ class PuppetReading(Reading):
     def iter_bucket_goals(
         self, start: int = 0, end: int | None = None
     ) -> Iterable[BucketGoalTuple]:
-        yield from self.bucket_goals[start:end]
+        yield from bucket_range(self.bucket_goals, start, end)
 
     def iter_axes(self, start: int = 0, end: int | None = None) -> Iterable[AxisTuple]:
         yield from self.axes[start:end]
@@ -234,7 +304,95 @@ class PuppetReading(Reading):
     def iter_bucket_hits(
         self, start: int = 0, end: int | None = None
     ) -> Iterable[BucketHitTuple]:
-        yield from self.bucket_hits[start:end]
+        yield from bucket_range(self.bucket_hits, start, end)
+
+
+class ColumnarReading(PuppetReading):
+    """
+    Utility reading which stores the bucket tables as typed arrays, with a column
+    for each field, rather than a tuple for each bucket. Bucket starts are only
+    stored if some buckets have no row (those of sparse coverpoints which were not
+    hit), otherwise the row of each bucket is its start.
+
+    Ranges of buckets are memoryview slices of the arrays, so are not copied. Writers
+    can use the bulk accessors (bucket_*_array) directly, rather than iterating
+    over tuples. The other tables are proportional to the number of coverpoints
+    rather than buckets, so are stored as tuples as in PuppetReading.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bucket_starts: array | None = None
+        self.bucket_goals: array = array("Q")
+        self.bucket_hits: array = array("Q")
+
+    @classmethod
+    def from_reading(cls, reading: Reading) -> "ColumnarReading":
+        """Copy any reading into columns"""
+        columnar = cls()
+        columnar.def_sha = reading.get_def_sha()
+        columnar.rec_sha = reading.get_rec_sha()
+        columnar.points = list(reading.iter_points())
+        columnar.axes = list(reading.iter_axes())
+        columnar.axis_values = list(reading.iter_axis_values())
+        columnar.goals = list(reading.iter_goals())
+        columnar.point_hits = list(reading.iter_point_hits())
+
+        starts = array("Q")
+        for bucket_goal in reading.iter_bucket_goals():
+            starts.append(bucket_goal.start)
+            columnar.bucket_goals.append(bucket_goal.goal)
+        for bucket_hit in reading.iter_bucket_hits():
+            columnar.bucket_hits.append(bucket_hit.hits)
+        if starts != array("Q", range(len(starts))):
+            columnar.bucket_starts = starts
+        return columnar
+
+    def _bucket_rows(self, start: int = 0, end: int | None = None) -> slice:
+        """Get the rows of buckets from start up to end"""
+        rows = len(self.bucket_hits)
+        if self.bucket_starts is None:
+            return slice(min(start, rows), rows if end is None else min(end, rows))
+        first = bisect_left(self.bucket_starts, start)
+        if end is None:
+            return slice(first, rows)
+        return slice(first, bisect_left(self.bucket_starts, end, first))
+
+    def bucket_starts_array(
+        self, start: int = 0, end: int | None = None
+    ) -> Sequence[int]:
+        rows = self._bucket_rows(start, end)
+        if self.bucket_starts is None:
+            return range(rows.start, rows.stop)
+        return memoryview(self.bucket_starts)[rows]
+
+    def bucket_goals_array(self, start: int = 0, end: int | None = None) -> memoryview:
+        return memoryview(self.bucket_goals)[self._bucket_rows(start, end)]
+
+    def bucket_hits_array(self, start: int = 0, end: int | None = None) -> memoryview:
+        return memoryview(self.bucket_hits)[self._bucket_rows(start, end)]
+
+    def iter_bucket_goals(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterable[BucketGoalTuple]:
+        yield from map(
+            partial(tuple.__new__, BucketGoalTuple),
+            zip(
+                self.bucket_starts_array(start, end),
+                self.bucket_goals_array(start, end),
+            ),
+        )
+
+    def iter_bucket_hits(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterable[BucketHitTuple]:
+        yield from map(
+            partial(tuple.__new__, BucketHitTuple),
+            zip(
+                self.bucket_starts_array(start, end),
+                self.bucket_hits_array(start, end),
+            ),
+        )
 
 
 class MergeReading(Reading):
@@ -247,17 +405,20 @@ class MergeReading(Reading):
         super().__init__()
         self.master = master
 
-        self.bucket_hits: list[int] = []
-        for bucket_hit in master.iter_bucket_hits():
-            self.bucket_hits.append(bucket_hit.hits)
-
-        goal_targets: list[int] = []
+        self.goal_targets: list[int] = []
         for goal in master.iter_goals():
-            goal_targets.append(goal.target)
+            self.goal_targets.append(goal.target)
 
-        self.bucket_targets: list[int] = []
+        # Goal and hits by bucket start. Sparse coverpoints only have the buckets
+        # which were hit, so further buckets may be added by each merge.
+        self.bucket_goals: dict[int, BucketGoalTuple] = {}
         for bucket_goal in master.iter_bucket_goals():
-            self.bucket_targets.append(goal_targets[bucket_goal.goal])
+            self.bucket_goals[bucket_goal.start] = bucket_goal
+
+        self.bucket_hits: dict[int, int] = {}
+        for bucket_hit in master.iter_bucket_hits():
+            self.bucket_hits[bucket_hit.start] = bucket_hit.hits
+        self.bucket_starts: list[int] = sorted(self.bucket_hits)
 
         if others:
             self.merge(*others)
@@ -276,7 +437,8 @@ class MergeReading(Reading):
     def iter_bucket_goals(
         self, start: int = 0, end: int | None = None
     ) -> Iterable[BucketGoalTuple]:
-        yield from self.master.iter_bucket_goals(start, end)
+        for bucket_start in self._bucket_starts(start, end):
+            yield self.bucket_goals[bucket_start]
 
     def iter_axes(self, start: int = 0, end: int | None = None) -> Iterable[AxisTuple]:
         yield from self.master.iter_axes(start, end)
@@ -292,8 +454,14 @@ class MergeReading(Reading):
     def iter_bucket_hits(
         self, start: int = 0, end: int | None = None
     ) -> Iterable[BucketHitTuple]:
-        for offset, hits in enumerate(self.bucket_hits[start:end]):
-            yield BucketHitTuple(start + offset, hits)
+        for bucket_start in self._bucket_starts(start, end):
+            yield BucketHitTuple(bucket_start, self.bucket_hits[bucket_start])
+
+    def _bucket_starts(self, start: int = 0, end: int | None = None) -> list[int]:
+        first = bisect_left(self.bucket_starts, start)
+        if end is None:
+            return self.bucket_starts[first:]
+        return self.bucket_starts[first : bisect_left(self.bucket_starts, end, first)]
 
     def iter_point_hits(
         self, start: int = 0, end: int | None = None, depth: int = 0
@@ -305,7 +473,7 @@ class MergeReading(Reading):
             for bucket_hit in self.iter_bucket_hits(
                 point.bucket_start, point.bucket_end
             ):
-                target = self.bucket_targets[bucket_hit.start]
+                target = self.goal_targets[self.bucket_goals[bucket_hit.start].goal]
                 if target > 0:
                     bucket_hits = min(bucket_hit.hits, target)
                     if bucket_hit.hits > 0:
@@ -340,5 +508,18 @@ class MergeReading(Reading):
                     "Tried to merge coverage with two different record hashes!"
                 )
 
+            reading_goals = None
             for bucket_hit in reading.iter_bucket_hits():
-                self.bucket_hits[bucket_hit.start] += bucket_hit.hits
+                if bucket_hit.start in self.bucket_hits:
+                    self.bucket_hits[bucket_hit.start] += bucket_hit.hits
+                    continue
+                # A sparse bucket which is not yet included
+                if reading_goals is None:
+                    reading_goals = {
+                        bucket_goal.start: bucket_goal
+                        for bucket_goal in reading.iter_bucket_goals()
+                    }
+                self.bucket_goals[bucket_hit.start] = reading_goals[bucket_hit.start]
+                self.bucket_hits[bucket_hit.start] = bucket_hit.hits
+            if reading_goals is not None:
+                self.bucket_starts = sorted(self.bucket_hits)
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 
+from typing import Iterable
+
 from rich.console import Console
 from rich.table import Column, Table
 
+from ..profile import ProfileTuple
 from .common import Reading, Writer
 
 
@@ -19,6 +22,10 @@ class ConsoleWriter(Writer):
         self.write_summary = summary
 
     def write(self, reading: Reading):
+        with reading.hold():
+            self._write(reading)
+
+    def _write(self, reading: Reading):
         summary_table_columns = [
             Column("Name", justify="left", style="cyan", no_wrap=True),
             Column("Description", justify="left", style="cyan", no_wrap=True),
@@ -187,3 +194,36 @@ class ConsoleWriter(Writer):
             console.print(point_table)
         if self.write_summary:
             console.print(summary_table)
+
+    def write_profile(self, report: Iterable[ProfileTuple]):
+        """
+        Write a sampling profile (from Covertop.profile_report) to the terminal
+        """
+        profile_table = Table(
+            Column("Name", justify="left", style="cyan", no_wrap=True),
+            Column("Type", justify="left", style="cyan", no_wrap=True),
+            Column("Calls", justify="right", style="cyan", no_wrap=True),
+            Column("Time (ms)", justify="right", style="cyan", no_wrap=True),
+            Column("Mean (us)", justify="right", style="cyan", no_wrap=True),
+            Column("Max (us)", justify="right", style="cyan", no_wrap=True),
+            Column("Hits", justify="right", style="cyan", no_wrap=True),
+            title="Sampling Profile",
+        )
+        for row in report:
+            if row.calls is None:
+                # Covergroups with no should_sample to profile
+                profile_table.add_row(
+                    row.path, row.kind, "-", "-", "-", "-", str(row.hits)
+                )
+                continue
+            mean_time = row.time / row.calls if row.calls else 0
+            profile_table.add_row(
+                row.path,
+                row.kind,
+                str(row.calls),
+                f"{row.time * 1e3:.3f}",
+                f"{mean_time * 1e6:.2f}",
+                f"{row.max_time * 1e6:.2f}",
+                str(row.hits),
+            )
+        Console().print(profile_table)
@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import hashlib
+from array import array
+from itertools import accumulate
+from itertools import chain as chain_iter
+
+from ..base import CoverBase
+from ..covergroup import Covergroup
+from ..coverpoint import Coverpoint
+from .common import (
+    AxisTuple,
+    AxisValueTuple,
+    GoalTuple,
+    PointHitTuple,
+    PointTuple,
+    tuples_from_columns,
+)
+
+
+def _bounds(sizes: list[int], starts: list[int], ends: list[int]):
+    """
+    Get the start and end bound of each node from the sizes of the nodes (in the
+    order their links are closed), given the index of the first and last+1 node
+    closed within each node
+    """
+    totals = [0, *accumulate(sizes)]
+    return [totals[i] for i in starts], [totals[i] for i in ends]
+
+
+class FlatChain:
+    """
+    Chain through the coverage tree as _chain_def and _chain_run do (see
+    common/chain.py), without creating and adding a link for each node.
+
+    Nodes are listed in pre-order, which is also the order of their (start, depth)
+    bounds. A node's own size is only added to the chain once its children have
+    been closed, so the size of each node is collected in that (post-) order, and
+    the start and end bounds of every node are found from the cumulative sums of
+    the sizes. The definition sha is a single running hash over the same digests.
+    """
+
+    def __init__(self, root: CoverBase):
+        root._flush()
+        self.nodes: list[CoverBase] = []
+        self.depths: list[int] = []
+        parents: list[int] = []
+
+        stack = [(root, 0, -1)]
+        while stack:
+            node, depth, parent = stack.pop()
+            index = len(self.nodes)
+            self.nodes.append(node)
+            self.depths.append(depth)
+            parents.append(parent)
+            if isinstance(node, Covergroup):
+                children = list(node.iter_children())
+                stack += [(child, depth + 1, index) for child in reversed(children)]
+
+        # Number of nodes in the subtree of each node
+        subtree = [1] * len(self.nodes)
+        for index in range(len(self.nodes) - 1, 0, -1):
+            subtree[parents[index]] += subtree[index]
+
+        # Nodes closed before each node is opened, and once it has been closed
+        self.closed_before = [index - depth for index, depth in enumerate(self.depths)]
+        self.closed_after = [
+            before + size for before, size in zip(self.closed_before, subtree)
+        ]
+        # Order in which the links of the nodes are closed
+        self.close_order = [0] * len(self.nodes)
+        for index, after in enumerate(self.closed_after):
+            self.close_order[after - 1] = index
+
+        self.coverpoints = [
+            index
+            for index, node in enumerate(self.nodes)
+            if isinstance(node, Coverpoint)
+        ]
+
+    def _node_bounds(self, sizes: list[int]):
+        """Get the start and end bounds of every node from their own sizes"""
+        closed_sizes = [sizes[index] for index in self.close_order]
+        return _bounds(closed_sizes, self.closed_before, self.closed_after)
+
+    def definition(self) -> tuple[str, list[PointTuple], list[AxisTuple], list]:
+        """
+        Get the definition sha, and the point, axis and goal tuples
+        """
+        count = len(self.nodes)
+        axes = [0] * count
+        axis_values = [0] * count
+        goals = [0] * count
+        buckets = [0] * count
+        targets = [0] * count
+        target_buckets = [0] * count
+        sha = hashlib.sha256()
+        for index in self.close_order:
+            node = self.nodes[index]
+            if isinstance(node, Coverpoint):
+                node._resolve_goals()
+                axes[index] = len(node._axes)
+                axis_values[index] = sum(axis.size for axis in node._axes)
+                goals[index] = len(node._goal_dict)
+                buckets[index] = node._bucket_count
+                targets[index], target_buckets[index] = node._target_totals()
+                for axis in node._axes:
+                    sha.update(axis.sha.digest())
+                for goal in node._goal_dict.values():
+                    sha.update(goal.sha.digest())
+            sha.update(node._sha.digest())
+
+        point_starts = self.closed_before
+        point_ends = self.closed_after
+        axis_starts, axis_ends = self._node_bounds(axes)
+        value_starts, value_ends = self._node_bounds(axis_values)
+        goal_starts, goal_ends = self._node_bounds(goals)
+        bucket_starts, bucket_ends = self._node_bounds(buckets)
+        target_starts, target_ends = self._node_bounds(targets)
+        tb_starts, tb_ends = self._node_bounds(target_buckets)
+
+        points = [
+            PointTuple(
+                start=point_starts[i],
+                depth=self.depths[i],
+                end=point_ends[i],
+                axis_start=axis_starts[i],
+                axis_end=axis_ends[i],
+                axis_value_start=value_starts[i],
+                axis_value_end=value_ends[i],
+                goal_start=goal_starts[i],
+                goal_end=goal_ends[i],
+                bucket_start=bucket_starts[i],
+                bucket_end=bucket_ends[i],
+                target=target_ends[i] - target_starts[i],
+                target_buckets=tb_ends[i] - tb_starts[i],
+                name=node._name,
+                description=node._description,
+            )
+            for i, node in enumerate(self.nodes)
+        ]
+
+        axis_tuples = []
+        goal_tuples = []
+        for i in self.coverpoints:
+            node = self.nodes[i]
+            value_start = value_starts[i]
+            for offset, axis in enumerate(node._axes):
+                axis_tuples.append(
+                    AxisTuple(
+                        start=axis_starts[i] + offset,
+                        value_start=value_start,
+                        value_end=value_start + axis.size,
+                        name=axis.name,
+                        description=axis.description,
+                    )
+                )
+                value_start += axis.size
+            for offset, goal in enumerate(node._goal_dict.values()):
+                goal_tuples.append(
+                    GoalTuple(
+                        start=goal_starts[i] + offset,
+                        target=goal.target,
+                        name=goal.name,
+                        description=goal.description,
+                    )
+                )
+
+        return sha.hexdigest(), points, axis_tuples, goal_tuples
+
+    def run(self) -> list[PointHitTuple]:
+        """
+        Get the point hit tuples
+        """
+        count = len(self.nodes)
+        hits = [0] * count
+        hit_buckets = [0] * count
+        full_buckets = [0] * count
+        for i in self.coverpoints:
+            hits[i], hit_buckets[i], full_buckets[i] = self.nodes[i]._run_stats
+
+        hit_starts, hit_ends = self._node_bounds(hits)
+        hb_starts, hb_ends = self._node_bounds(hit_buckets)
+        fb_starts, fb_ends = self._node_bounds(full_buckets)
+        return [
+            PointHitTuple(
+                start=self.closed_before[i],
+                depth=self.depths[i],
+                hits=hit_ends[i] - hit_starts[i],
+                hit_buckets=hb_ends[i] - hb_starts[i],
+                full_buckets=fb_ends[i] - fb_starts[i],
+            )
+            for i in range(count)
+        ]
+
+
+class DefinitionTables:
+    """
+    The definition side of a reading of the coverage below a node, which does not
+    change once the tree is built, along with the chain used to read the run side.
+
+    Bucket goals are kept per coverpoint as a column of goals, from which tuples are
+    built for each read. Those of sparse coverpoints depend on which buckets have
+    been hit so far and must be read each time (these are None).
+    """
+
+    def __init__(self, chain: FlatChain):
+        self.chain = chain
+        self.def_sha, self.points, self.axes, self.goals = chain.definition()
+
+        self.axis_values: list[AxisValueTuple] = []
+        for index in chain.coverpoints:
+            start = self.points[index].axis_value_start
+            end = self.points[index].axis_value_end
+            values = chain_iter.from_iterable(
+                axis.values.keys() for axis in chain.nodes[index]._axes
+            )
+            self.axis_values += tuples_from_columns(
+                AxisValueTuple, range(start, end), values
+            )
+
+        self.goal_columns: list[array | None] = []
+        for index in chain.coverpoints:
+            coverpoint = chain.nodes[index]
+            if coverpoint.SPARSE:
+                self.goal_columns.append(None)
+                continue
+            goal_start = self.points[index].goal_start
+            self.goal_columns.append(
+                array("Q", map(goal_start.__add__, coverpoint._cvg_goals))
+            )
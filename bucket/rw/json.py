@@ -2,18 +2,22 @@
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
 import json
+import os
 from pathlib import Path
+from typing import Iterator, TextIO
 
 from .common import (
     AxisTuple,
     AxisValueTuple,
     BucketGoalTuple,
     BucketHitTuple,
+    ColumnarReading,
     GoalTuple,
     PointHitTuple,
     PointTuple,
     Reading,
     Writer,
+    iter_chunks,
 )
 
 ###############################################################################
@@ -21,9 +25,52 @@ from .common import (
 ###############################################################################
 
 
+def bucket_rows(reading: Reading, column: str) -> Iterator:
+    """
+    Get the rows of the bucket goal or hit table. Columnar readings are written
+    straight from their columns, rather than through a tuple for each bucket.
+    """
+    if isinstance(reading, ColumnarReading):
+        starts = reading.bucket_starts_array()
+        return zip(starts, getattr(reading, f"bucket_{column}_array")())
+    return getattr(reading, f"iter_bucket_{column}")()
+
+
+def dump_chunked(value, f: TextIO):
+    """
+    Write a value as JSON as json.dump does, except that iterators of rows are
+    written as lists a chunk at a time, rather than all being held at once
+    """
+    if isinstance(value, dict):
+        f.write("{")
+        for index, (key, item) in enumerate(value.items()):
+            f.write(", " * bool(index) + json.dumps(key) + ": ")
+            dump_chunked(item, f)
+        f.write("}")
+    elif isinstance(value, list):
+        f.write("[")
+        for index, item in enumerate(value):
+            f.write(", " * bool(index))
+            dump_chunked(item, f)
+        f.write("]")
+    elif isinstance(value, Iterator):
+        f.write("[")
+        for index, chunk in enumerate(iter_chunks(value)):
+            # Rows are encoded a chunk at a time, less the brackets of the chunk
+            f.write(", " * bool(index) + json.dumps(chunk)[1:-1])
+        f.write("]")
+    else:
+        f.write(json.dumps(value))
+
+
 class JSONWriter(Writer):
     """
     Write to a json file
+
+    The new reading is written a chunk of rows at a time, but readings already in
+    the file are loaded in full to be written back alongside it, so the memory used
+    grows with the size of the existing file. Write each large reading to a file of
+    its own (or use SQLAccessor) to keep memory bounded.
     """
 
     def __init__(self, path: str | Path):
@@ -58,29 +105,38 @@ class JSONWriter(Writer):
         with self.path.open("r") as f:
             data = json.load(f)
 
-            definition = {
-                "sha": reading.get_def_sha(),
-                "point": [list(it) for it in reading.iter_points()],
-                "axis": [list(it) for it in reading.iter_axes()],
-                "axis_value": [list(it) for it in reading.iter_axis_values()],
-                "goal": [list(it) for it in reading.iter_goals()],
-                "bucket_goal": [list(it) for it in reading.iter_bucket_goals()],
-            }
-
-            definition_id = len(data["definitions"])
-            data["definitions"].append(definition)
-
-            record = {
-                "def": definition_id,
-                "sha": "",
-                "point_hit": [list(it) for it in reading.iter_point_hits()],
-                "bucket_hit": [list(it) for it in reading.iter_bucket_hits()],
-            }
-
-            record_id = len(data["records"])
-            data["records"].append(record)
-
-        with self.path.open("w") as f:
-            json.dump(data, f)
+        # Tables are written from the reading as they are iterated
+        definition = {
+            "sha": reading.get_def_sha(),
+            "point": iter(reading.iter_points()),
+            "axis": iter(reading.iter_axes()),
+            "axis_value": iter(reading.iter_axis_values()),
+            "goal": iter(reading.iter_goals()),
+            "bucket_goal": bucket_rows(reading, "goals"),
+        }
+
+        definition_id = len(data["definitions"])
+        data["definitions"].append(definition)
+
+        record = {
+            "def": definition_id,
+            "sha": "",
+            "point_hit": iter(reading.iter_point_hits()),
+            "bucket_hit": bucket_rows(reading, "hits"),
+        }
+
+        record_id = len(data["records"])
+        data["records"].append(record)
+
+        # The file is replaced once completely written, holding sampling meanwhile
+        # as the reading may read the coverage as it is written
+        partial_path = self.path.with_name(self.path.name + ".partial")
+        try:
+            with reading.hold(), partial_path.open("w") as f:
+                dump_chunked(data, f)
+            os.replace(partial_path, self.path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
 
         return record_id
@@ -1,77 +1,243 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
-from ..axis import Axis
-from ..covergroup import CoverBase
-from ..coverpoint import Coverpoint
-from ..goal import GoalItem
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain as chain_iter
+from itertools import islice
+from typing import Iterable
+
 from .common import (
     AxisTuple,
     AxisValueTuple,
     BucketGoalTuple,
     BucketHitTuple,
+    ColumnarReading,
     GoalTuple,
     PointHitTuple,
     PointTuple,
     PuppetReading,
     Reader,
+    Reading,
+    paused_gc,
+    tuples_from_columns,
 )
+from .flatchain import DefinitionTables
 
 
 class PointReader(Reader):
     """
-    Read coverage from coverpoints
+    Read coverage from coverpoints. The bucket tables are stored as tuples, or as
+    columns if columnar (see ColumnarReading).
     """
 
-    def __init__(self, context_sha):
+    def __init__(self, context_sha, columnar: bool = False):
         self._rec_sha = context_sha
+        self._columnar = columnar
+
+    def stream(self, point) -> "StreamingReading":
+        """
+        Read coverage from coverpoints as it is iterated (see StreamingReading),
+        rather than storing every bucket in the reading. Pending sampling is
+        finished as the definition tables are read.
+        """
+        return StreamingReading(point, point._definition_tables(), self._rec_sha)
 
     def read(self, point):
-        reading = PuppetReading()
+        with paused_gc():
+            if self._columnar:
+                return self._read_columnar(point)
+            return self._read(point)
 
-        chain = point._chain_def()
-        reading.def_sha = chain.end.sha.hexdigest()
+    def _read_tables(self, reading: PuppetReading, tables: DefinitionTables):
+        """Fill in the tables other than those of buckets"""
+        reading.def_sha = tables.def_sha
         reading.rec_sha = self._rec_sha
-        for point_link in sorted(
-            chain.index.iter(CoverBase), key=lambda link: (link.start.point, link.depth)
-        ):
-            reading.points.append(PointTuple.from_link(point_link))
-
-            if isinstance(point_link.item, Coverpoint):
-                start = point_link.start.bucket
-                goal_start = point_link.start.goal
-                goal_offsets = {
-                    k: i for i, k in enumerate(point_link.item._goal_dict.keys())
-                }
-                for offset, goal in enumerate(point_link.item._bucket_goals()):
-                    bg_tuple = BucketGoalTuple(
-                        start=(start + offset), goal=(goal_start + goal_offsets[goal])
-                    )
-                    reading.bucket_goals.append(bg_tuple)
-
-        for axis_link in chain.index.iter(Axis):
-            reading.axes.append(AxisTuple.from_link(axis_link))
-
-            start = axis_link.start.axis_value
-            for offset, axis_value in enumerate(axis_link.item.values.keys()):
-                av_tuple = AxisValueTuple(start=(start + offset), value=axis_value)
-                reading.axis_values.append(av_tuple)
-
-        for goal_link in chain.index.iter(GoalItem):
-            reading.goals.append(GoalTuple.from_link(goal_link))
+        # The tables may be shared between readings, so are copied
+        reading.points = list(tables.points)
+        reading.axes = list(tables.axes)
+        reading.axis_values = list(tables.axis_values)
+        reading.goals = list(tables.goals)
+        reading.point_hits = tables.chain.run()
+
+    def _read(self, point):
+        reading = PuppetReading()
+        tables = point._definition_tables()
+        self._read_tables(reading, tables)
+        chain = tables.chain
+
+        # Bucket goals (if not in the definition) and hits are read in a single
+        # pass over the buckets of each coverpoint, and built as columns
+        for index, goals in zip(chain.coverpoints, tables.goal_columns):
+            coverpoint = chain.nodes[index]
+            start = reading.points[index].bucket_start
+            if goals is not None:
+                hits = coverpoint._cvg_hits
+                starts = range(start, start + len(hits))
+                reading.bucket_goals += tuples_from_columns(
+                    BucketGoalTuple, starts, goals
+                )
+            else:
+                # Only buckets of sparse coverpoints which have been hit are included
+                offsets, goals, hits = self._sparse_columns(coverpoint)
+                starts = [start + offset for offset in offsets]
+                goal_start = reading.points[index].goal_start
+                reading.bucket_goals += tuples_from_columns(
+                    BucketGoalTuple, starts, [goal_start + goal for goal in goals]
+                )
+            reading.bucket_hits += tuples_from_columns(BucketHitTuple, starts, hits)
 
         self.point = point
-        chain = self.point._chain_run()
+        return reading
 
-        for point_link in sorted(
-            chain.index.iter(CoverBase), key=lambda link: (link.start.point, link.depth)
-        ):
-            reading.point_hits.append(PointHitTuple.from_link(point_link))
+    def _read_columnar(self, point):
+        reading = ColumnarReading()
+        tables = point._definition_tables()
+        self._read_tables(reading, tables)
+        chain = tables.chain
 
-            if isinstance(point_link.item, Coverpoint):
-                start = point_link.start.bucket
-                for offset, hits in enumerate(point_link.item._bucket_hits()):
-                    bh_tuple = BucketHitTuple(start=(start + offset), hits=hits)
-                    reading.bucket_hits.append(bh_tuple)
+        # Bucket starts are only needed if sparse coverpoints leave gaps
+        starts = array("Q") if None in tables.goal_columns else None
+        for index, goals in zip(chain.coverpoints, tables.goal_columns):
+            coverpoint = chain.nodes[index]
+            start = reading.points[index].bucket_start
+            if goals is not None:
+                reading.bucket_goals += goals
+                reading.bucket_hits += coverpoint._cvg_hits
+                if starts is not None:
+                    starts += array("Q", range(start, start + len(goals)))
+            else:
+                offsets, goals, hits = self._sparse_columns(coverpoint)
+                goal_start = reading.points[index].goal_start
+                reading.bucket_goals += array("Q", [goal_start + g for g in goals])
+                reading.bucket_hits += array("Q", hits)
+                starts += array("Q", [start + offset for offset in offsets])
+        reading.bucket_starts = starts
 
+        self.point = point
         return reading
+
+    @staticmethod
+    def _sparse_columns(coverpoint) -> tuple:
+        """Get the offset, goal and hits of each hit bucket of a sparse coverpoint"""
+        return tuple(zip(*coverpoint._sparse_buckets())) or ((), (), ())
+
+
+class StreamingReading(Reading):
+    """
+    Reading which generates the rows of each table from the coverage tree as they
+    are iterated, rather than storing them. The definition tables are those kept by
+    the tree, and bucket rows are made from the goals and hits of one coverpoint at
+    a time, so (with writers which write rows in chunks) the memory used by an
+    export does not grow with the number of buckets.
+
+    Bucket hits are read as they are iterated, so writers hold sampling (see hold)
+    until the reading has been written.
+    """
+
+    def __init__(self, point, tables: DefinitionTables, rec_sha: str):
+        self.point = point
+        self.tables = tables
+        self.rec_sha = rec_sha
+        self.point_hits = tables.chain.run()
+        # Bucket start of each coverpoint, in order
+        self.point_bucket_starts = [
+            tables.points[index].bucket_start for index in tables.chain.coverpoints
+        ]
+
+    @contextmanager
+    def hold(self):
+        """
+        Finish any pending sampling and hold further sampling, so the point hits
+        (read again here) and bucket hits are read from the same coverage
+        """
+        with self.point._hold_sampling():
+            self.point_hits = self.tables.chain.run()
+            yield
+
+    def get_def_sha(self) -> str:
+        return self.tables.def_sha
+
+    def get_rec_sha(self) -> str:
+        return self.rec_sha
+
+    def iter_points(
+        self, start: int = 0, end: int | None = None, depth: int = 0
+    ) -> Iterable[PointTuple]:
+        offset_end = None if end is None else end + depth
+        yield from self.tables.points[start + depth : offset_end]
+
+    def iter_axes(self, start: int = 0, end: int | None = None) -> Iterable[AxisTuple]:
+        yield from self.tables.axes[start:end]
+
+    def iter_axis_values(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterable[AxisValueTuple]:
+        yield from self.tables.axis_values[start:end]
+
+    def iter_goals(self, start: int = 0, end: int | None = None) -> Iterable[GoalTuple]:
+        yield from self.tables.goals[start:end]
+
+    def iter_point_hits(
+        self, start: int = 0, end: int | None = None, depth: int = 0
+    ) -> Iterable[PointHitTuple]:
+        offset_end = None if end is None else end + depth
+        yield from self.point_hits[start + depth : offset_end]
+
+    def iter_bucket_goals(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterable[BucketGoalTuple]:
+        return chain_iter.from_iterable(
+            self._iter_point_buckets(BucketGoalTuple, start, end)
+        )
+
+    def iter_bucket_hits(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterable[BucketHitTuple]:
+        return chain_iter.from_iterable(
+            self._iter_point_buckets(BucketHitTuple, start, end)
+        )
+
+    def _iter_point_buckets(self, typ: type, start: int, end: int | None):
+        """
+        Generate an iterator over the bucket goal or hit tuples of each coverpoint,
+        for buckets from start up to end. The tuples of each coverpoint are made by
+        a single map, rather than yielded one at a time.
+        """
+        make = partial(tuple.__new__, typ)
+        chain = self.tables.chain
+        first = max(bisect_right(self.point_bucket_starts, start) - 1, 0)
+        for row in range(first, len(chain.coverpoints)):
+            index = chain.coverpoints[row]
+            point = self.tables.points[index]
+            if end is not None and point.bucket_start >= end:
+                break
+            low = max(start, point.bucket_start)
+            high = point.bucket_end if end is None else min(end, point.bucket_end)
+            if low >= high:
+                continue
+            coverpoint = chain.nodes[index]
+            goals = self.tables.goal_columns[row]
+            if goals is None:
+                # Only buckets of sparse coverpoints which have been hit are included
+                yield self._iter_sparse(typ, point, coverpoint, low, high)
+                continue
+            column = goals if typ is BucketGoalTuple else coverpoint._cvg_hits
+            values = islice(column, low - point.bucket_start, high - point.bucket_start)
+            yield map(make, zip(range(low, high), values))
+
+    @staticmethod
+    def _iter_sparse(typ: type, point, coverpoint, low: int, high: int):
+        """
+        Generate the bucket goal or hit tuples of a sparse coverpoint from low up to
+        high, for the buckets which have been hit
+        """
+        for offset, goal, hits in coverpoint._sparse_buckets():
+            start = point.bucket_start + offset
+            if low <= start < high:
+                if typ is BucketGoalTuple:
+                    yield BucketGoalTuple(start, point.goal_start + goal)
+                else:
+                    yield BucketHitTuple(start, hits)
@@ -2,9 +2,9 @@
 # Copyright (c) 2023-2024 Vypercore. All Rights Reserved
 
 from pathlib import Path
-from typing import Iterable, overload
+from typing import Iterable, NamedTuple, overload
 
-from sqlalchemy import Integer, String, create_engine, select
+from sqlalchemy import Integer, String, create_engine, insert, select
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from .common import (
@@ -20,6 +20,7 @@ from .common import (
     Reader,
     Reading,
     Writer,
+    iter_chunks,
 )
 
 ###############################################################################
@@ -161,42 +162,40 @@ class SQLWriter(Writer):
         self.engine = engine
 
     def write(self, reading: Reading):
-        with Session(self.engine) as self.session:
+        with reading.hold(), Session(self.engine) as self.session:
             # Write the definition out
             def_row = DefinitionRow(sha=reading.get_def_sha())
             self.session.add(def_row)
             self.session.commit()
-            def_ref = def_row.definition
+            def_ref = {"definition": def_row.definition}
 
-            for point in reading.iter_points():
-                self.session.add(PointRow.from_tuple(def_ref, point))
+            self._insert(PointRow, def_ref, reading.iter_points())
+            self._insert(AxisRow, def_ref, reading.iter_axes())
+            self._insert(AxisValueRow, def_ref, reading.iter_axis_values())
+            self._insert(GoalRow, def_ref, reading.iter_goals())
+            self._insert(BucketGoalRow, def_ref, reading.iter_bucket_goals())
 
-            for axis in reading.iter_axes():
-                self.session.add(AxisRow.from_tuple(def_ref, axis))
-
-            for axis_value in reading.iter_axis_values():
-                self.session.add(AxisValueRow.from_tuple(def_ref, axis_value))
-
-            for goal in reading.iter_goals():
-                self.session.add(GoalRow.from_tuple(def_ref, goal))
-
-            for bucket_goal in reading.iter_bucket_goals():
-                self.session.add(BucketGoalRow.from_tuple(def_ref, bucket_goal))
-
-            rec_row = RunRow(definition=def_ref, sha="")
+            rec_row = RunRow(definition=def_row.definition, sha="")
             self.session.add(rec_row)
             self.session.commit()
-            rec_ref = rec_row.run
+            rec_ref = {"run": rec_row.run}
 
-            for point_hit in reading.iter_point_hits():
-                self.session.add(PointHitRow.from_tuple(rec_ref, point_hit))
-
-            for bucket_hit in reading.iter_bucket_hits():
-                self.session.add(BucketHitRow.from_tuple(rec_ref, bucket_hit))
+            self._insert(PointHitRow, rec_ref, reading.iter_point_hits())
+            self._insert(BucketHitRow, rec_ref, reading.iter_bucket_hits())
 
             self.session.commit()
 
-        return rec_ref
+        return rec_ref["run"]
+
+    def _insert(self, table: type[BaseRow], ref: dict, rows: Iterable[NamedTuple]):
+        """
+        Insert rows into a table in chunks, so that only a chunk of rows is held at
+        once (the rows may be generated as they are iterated)
+        """
+        for chunk in iter_chunks(rows):
+            self.session.execute(
+                insert(table), [{**ref, **row._asdict()} for row in chunk]
+            )
 
 
 class SQLReader(Reader):
@@ -1,10 +1,148 @@
 # SPDX-License-Identifier: MIT
-# Copyright (c) 2023-2024 Vypercore. All Rights Reserved
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
 
+import itertools
+import random
 from enum import Enum, auto
+from functools import wraps
+from time import perf_counter
+from typing import Callable
 
 
 class CoverageTriggers(Enum):
     ALL = auto()
     SOMETIMES = auto()
     OCCASSIONALLY = auto()
+
+
+class SampleRate:
+    """
+    The rate at which coverpoints and covergroups with a given trigger are sampled
+    """
+
+    def selector(self) -> Callable[[], bool]:
+        """
+        Create a function which is called for each trace, returning True if the trace
+        should be sampled
+        """
+        raise NotImplementedError("This needs to be implemented by the sample rate")
+
+    def wrap(self, function: Callable) -> Callable:
+        """
+        Wrap a sampling function so that it is only called for selected traces.
+        False is returned for traces which are not selected.
+        """
+        select = self.selector()
+
+        @wraps(function)
+        def triggered(trace):
+            if select():
+                return function(trace)
+            return False
+
+        return triggered
+
+    def wrap_batch(self, function: Callable) -> Callable:
+        """
+        Wrap a batch sampling function so that it is only called with the selected
+        traces of each batch, each trace being selected as if sampled on its own
+        """
+        select = self.selector()
+
+        @wraps(function)
+        def triggered(traces):
+            traces = [trace for trace in traces if select()]
+            if traces:
+                function(traces)
+
+        return triggered
+
+
+class EveryNth(SampleRate):
+    """Sample the first of every N traces"""
+
+    def __init__(self, n: int):
+        assert n > 0, "n must be 1+"
+        self.n = n
+
+    def selector(self):
+        return itertools.cycle([True] + [False] * (self.n - 1)).__next__
+
+
+class Probability(SampleRate):
+    """Sample each trace with the given probability"""
+
+    def __init__(self, probability: float, seed: int | None = None):
+        assert 0 <= probability <= 1, "probability must be between 0 and 1"
+        self.probability = probability
+        self.seed = seed
+
+    def selector(self):
+        rng = random.Random(self.seed)
+        probability = self.probability
+        return lambda: rng.random() < probability
+
+
+class TimeBudget(SampleRate):
+    """
+    Sample traces while the time spent sampling is within a fraction of the time
+    since sampling started
+    """
+
+    def __init__(self, fraction: float):
+        assert 0 < fraction <= 1, "fraction must be greater than 0, up to 1"
+        self.fraction = fraction
+
+    def wrap(self, function):
+        fraction = self.fraction
+        start = None
+        spent = 0.0
+
+        @wraps(function)
+        def triggered(trace):
+            nonlocal start, spent
+            now = perf_counter()
+            if start is None:
+                start = now
+            elif spent > fraction * (now - start):
+                return False
+            result = function(trace)
+            spent += perf_counter() - now
+            return result
+
+        return triggered
+
+    def wrap_batch(self, function):
+        fraction = self.fraction
+        start = None
+        spent = 0.0
+        sampled = 0
+
+        @wraps(function)
+        def triggered(traces):
+            nonlocal start, spent, sampled
+            now = perf_counter()
+            if start is None:
+                start = now
+            budget = fraction * (now - start) - spent
+            if budget < 0:
+                return
+            # Traces are sampled while within the budget, as if sampled on their
+            # own, estimating the time for each from the traces sampled so far
+            count = len(traces)
+            if not sampled:
+                count = 1
+            elif spent:
+                count = min(count, int(budget * sampled / spent) + 1)
+            function(traces[:count])
+            spent += perf_counter() - now
+            sampled += count
+
+        return triggered
+
+
+# Sample rates used for each trigger, unless overridden by the covertop
+DEFAULT_TRIGGER_RATES: dict[CoverageTriggers, SampleRate] = {
+    CoverageTriggers.SOMETIMES: EveryNth(10),
+    CoverageTriggers.OCCASSIONALLY: EveryNth(100),
+}
@@ -16,18 +16,15 @@ class TopCats(Covergroup):
 
     NAME = "cats"
     DESCRIPTION = "Kitty coverage"
+    # Only cat traces are passed on to be sampled
+    ROUTE_KEY = "pet_type"
+    ROUTE_VALUES = ["Cat"]
 
     def setup(self, ctx):
         self.add_coverpoint(CatStats())
         self.add_covergroup(CatsAndToys())
         self.add_coverpoint(VIPNames())
 
-    def should_sample(self, trace):
-        """
-        This function is used to stop cat coverage being sampled when not relevant
-        """
-        return trace.pet_type == "Cat"
-
 
 class CatsAndToys(Covergroup):
     """
@@ -17,17 +17,14 @@ class TopDogs(Covergroup):
 
     NAME = "dogs"
     DESCRIPTION = "Doggy coverage"
+    # Only dog traces are passed on to be sampled
+    ROUTE_KEY = "pet_type"
+    ROUTE_VALUES = ["Dog"]
 
     def setup(self, ctx):
         self.add_coverpoint(DogStats())
         self.add_covergroup(DogsAndToys())
 
-    def should_sample(self, trace):
-        """
-        This function is used to stop dog coverage being sampled when not relevant
-        """
-        return trace.pet_type == "Dog"
-
 
 class DogsAndToys(Covergroup):
     """
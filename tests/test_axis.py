@@ -373,21 +373,45 @@ class TestGetNamedValue:
         for test_stimulus, expected_result in test_stimuli.items():
             assert axis.get_named_value(test_stimulus) == expected_result
 
-    def test_cached_values(self):
-        """Check that when the same value is checked, the result is cached correctly"""
+    def test_value_index(self):
+        """Check that the index of the value/range is returned"""
         axis = Axis(
             name="test", values=[1, 2, 3, [4, 5]], description="test", enable_other=True
         )
 
-        test_stimuli = [1, 4, 5, 6]
-        for count, test_stimulus in enumerate(test_stimuli, start=1):
-            result_1 = axis.get_named_value(test_stimulus)
-            result_2 = axis.get_named_value(test_stimulus)
+        # Names are sorted: ["1", "2", "3", "4 -> 5", "Other"]
+        test_stimuli = {1: 0, "2": 1, 3: 2, 4: 3, 5: 3, 6: 4, "Steve": 4}
+        for test_stimulus, expected_result in test_stimuli.items():
+            assert axis.get_value_index(test_stimulus) == expected_result
+
+    def test_overlapping_ranges(self):
+        """Check that the first matching name is returned when ranges overlap"""
+        axis = Axis(
+            name="test",
+            values={"a_wide": [0, 100], "b_narrow": [10, 20], "c_exact": 50, "d": 200},
+            description="test",
+        )
+
+        test_stimuli = {
+            0: "a_wide",
+            15: "a_wide",
+            50: "a_wide",
+            100: "a_wide",
+            200: "d",
+        }
+        for test_stimulus, expected_result in test_stimuli.items():
+            assert axis.get_named_value(test_stimulus) == expected_result
+
+        axis = Axis(
+            name="test",
+            values={"a_exact": 15, "b_wide": [0, 100], "c_narrow": [10, 20]},
+            description="test",
+        )
 
-            assert result_1 == result_2
+        test_stimuli = {15: "a_exact", 12: "b_wide", 0: "b_wide", 100: "b_wide"}
+        for test_stimulus, expected_result in test_stimuli.items():
+            assert axis.get_named_value(test_stimulus) == expected_result
 
-            # Verify that a cache hit occurred
-            cache_info = axis.get_named_value.cache_info()
-            # The first call doesn't count as a hit,
-            # but the second call should be a hit.
-            assert cache_info.hits == count
+        for test_stimulus in [-1, 101]:
+            with pytest.raises(AxisUnrecognisedValue):
+                axis.get_named_value(test_stimulus)
@@ -0,0 +1,605 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import json
+import shutil
+import subprocess
+from array import array
+from pathlib import Path
+
+import pytest
+
+from bucket import Covergroup, Coverpoint, Covertop
+from bucket.axis import AxisUnrecognisedValue
+from bucket.context import CoverageContext
+from bucket.rw import ColumnarReading, JSONWriter, PointReader, SQLAccessor
+
+VIEWER_READERS = (
+    Path(__file__).parent.parent / "viewer/src/features/Dashboard/lib/readers.ts"
+)
+# Reads the coverage written by JSONWriter with the viewer, printing the bucket
+# goals and hits in each range
+VIEWER_SCRIPT = """
+import { readFileSync } from "node:fs";
+import { JSONReader } from "%s";
+const data = JSON.parse(readFileSync(process.argv[2], "utf8"));
+const reading = new JSONReader(data).read(0);
+const ranges = JSON.parse(process.argv[3]);
+console.log(JSON.stringify(ranges.map(([start, end]) => [
+    [...reading.iter_bucket_goals(start, end)].map(Object.values),
+    [...reading.iter_bucket_hits(start, end)].map(Object.values),
+])));
+"""
+
+
+def node_strips_types() -> bool:
+    """Check whether node can run the viewer's TypeScript directly"""
+    node = shutil.which("node")
+    return (
+        node is not None
+        and subprocess.run(
+            [node, "--experimental-strip-types", "-e", ""], capture_output=True
+        ).returncode
+        == 0
+    )
+
+
+class Cross(Coverpoint):
+    NAME = "cross"
+    DESCRIPTION = "A simple cross for testing"
+
+    def setup(self, ctx):
+        self.add_axis(name="a", values=[0, 1, 2], description="a")
+        self.add_axis(name="b", values={"lo": [0, 9], "hi": [10, 19]}, description="b")
+        self.add_goal("SKIP", "Ignored bucket", ignore=True)
+        self.add_goal("BAD", "Illegal bucket", illegal=True)
+        self.add_goal("MANY", "Lots of hits", target=20)
+
+    def apply_goals(self, bucket, goals):
+        if bucket.a == "0" and bucket.b == "hi":
+            return goals.SKIP
+        if bucket.a == "2" and bucket.b == "lo":
+            return goals.BAD
+        if bucket.a == "1":
+            return goals.MANY
+
+    def sample(self, trace):
+        self.bucket.hit(a=trace["a"], b=trace["b"])
+
+
+class Group(Covergroup):
+    NAME = "group"
+
+    def setup(self, ctx):
+        self.add_coverpoint(Cross())
+
+
+class Top(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(Group())
+
+
+def bucket_hits(cvg):
+    reading = PointReader("").read(cvg)
+    return [bucket_hit.hits for bucket_hit in reading.iter_bucket_hits()]
+
+
+class TestBucketHit:
+    def test_bucket_index(self):
+        """Check that buckets are addressed with the last axis changing fastest"""
+        cvg = Top()
+        cross = cvg.group.cross
+
+        # Buckets: (0,hi) (0,lo) (1,hi) (1,lo) (2,hi) (2,lo)
+        assert cross._bucket_count == 6
+        cvg.sample({"a": 1, "b": 3})
+        cvg.sample({"a": 1, "b": 3})
+        cvg.sample({"a": 2, "b": 15})
+        cvg.sample({"a": 0, "b": 15})
+
+        assert bucket_hits(cvg) == [0, 0, 0, 2, 1, 0]
+        assert cross._bucket_axis_values(3) == {"a": "1", "b": "lo"}
+
+    def test_goals(self):
+        """Check that each bucket is given the correct goal"""
+        cvg = Top()
+        reading = PointReader("").read(cvg)
+        goals = list(reading.iter_goals())
+        bucket_goal_names = [
+            goals[bucket_goal.goal].name for bucket_goal in reading.iter_bucket_goals()
+        ]
+        assert bucket_goal_names == [
+            "SKIP",
+            "DEFAULT",
+            "MANY",
+            "MANY",
+            "DEFAULT",
+            "BAD",
+        ]
+
+        point = next(reading.iter_points(depth=2))
+        assert point.target == 60
+        assert point.target_buckets == 4
+
+    def test_illegal(self):
+        """Check that illegal buckets raise when requested"""
+        cvg = Top(except_on_illegal=True)
+        with pytest.raises(RuntimeError):
+            cvg.sample({"a": 2, "b": 3})
+
+    def test_point_hits(self):
+        """Check that point hit statistics are capped by bucket targets"""
+        cvg = Top()
+        for _ in range(30):
+            cvg.sample({"a": 0, "b": 0})
+        cvg.sample({"a": 1, "b": 12})
+
+        reading = PointReader("").read(cvg)
+        point_hit = next(reading.iter_point_hits(depth=2))
+        assert point_hit.hits == 11
+        assert point_hit.hit_buckets == 2
+        assert point_hit.full_buckets == 1
+
+
+class BatchCross(Cross):
+    def sample_batch(self, traces):
+        self.bucket.hit_many(
+            a=[trace["a"] for trace in traces], b=[trace["b"] for trace in traces]
+        )
+
+
+class BatchGroup(Covergroup):
+    NAME = "group"
+
+    def setup(self, ctx):
+        self.add_coverpoint(BatchCross(), name="cross")
+
+    def should_sample(self, trace):
+        return trace["a"] != 1
+
+
+class BatchTop(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(BatchGroup())
+
+
+class TestBatchSample:
+    traces = [{"a": a, "b": b} for a in range(2) for b in range(20)] * 3
+
+    def test_sample_batch(self):
+        """Check that sampling in a batch matches sampling each trace"""
+        cvg_single = Top()
+        for trace in self.traces:
+            cvg_single.sample(trace)
+
+        cvg_batch = Top()
+        cvg_batch.sample_batch(self.traces)
+
+        assert bucket_hits(cvg_batch) == bucket_hits(cvg_single)
+
+    def test_hit_many(self):
+        """Check that hit_many applies goals and should_sample"""
+        cvg = BatchTop()
+        cvg.sample_batch(self.traces)
+        assert bucket_hits(cvg) == [0, 30, 0, 0, 0, 0]
+
+    def test_hit_many_set_axes(self):
+        """Check that axes set with set_axes apply to every hit"""
+        cvg = Top()
+        bucket = cvg.group.cross.bucket
+        with bucket:
+            bucket.set_axes(a=1)
+            bucket.hit_many(b=[0, 5, 10, 11, 12])
+        assert bucket_hits(cvg) == [0, 0, 3, 2, 0, 0]
+
+    def test_hit_many_illegal(self):
+        """Check that illegal buckets raise when requested"""
+        cvg = BatchTop(except_on_illegal=True)
+        with pytest.raises(RuntimeError):
+            cvg.sample_batch([{"a": 2, "b": 3}])
+
+
+class TestCompiledHits:
+    def test_compiled_hits(self):
+        """Check that compiled hit functions match the default hit function"""
+        cvg = Top()
+        cvg_compiled = Top(compile_hits=True)
+        for cover in (cvg, cvg_compiled):
+            for a in (0, 1, "1", "2"):
+                for b in (0, 5, 10, 19, "lo", "hi"):
+                    if not (a in (2, "2") and b in (0, 5, "lo")):
+                        cover.sample({"a": a, "b": b})
+            cover.group.cross.bucket.hit_values(1, 1)
+
+        assert bucket_hits(cvg_compiled) == bucket_hits(cvg)
+        assert bucket_hits(cvg_compiled) == [0, 3, 6, 7, 3, 0]
+
+    def test_compiled_illegal(self):
+        """Check that compiled hit functions raise on illegal buckets"""
+        cvg = Top(except_on_illegal=True, compile_hits=True)
+        with pytest.raises(RuntimeError):
+            cvg.sample({"a": 2, "b": 3})
+        with pytest.raises(AxisUnrecognisedValue):
+            cvg.sample({"a": 3, "b": 3})
+
+
+class RuleCross(Cross):
+    def setup(self, ctx):
+        super().setup(ctx)
+        self.add_goal_rule("SKIP", a="0", b="hi")
+        self.add_goal_rule("BAD", a=lambda name: name == "2", b=["lo"])
+        self.add_goal_rule("MANY", a=slice(1, 2))
+
+    apply_goals = Coverpoint.apply_goals
+
+
+class CountingCross(Cross):
+    def apply_goals(self, bucket, goals):
+        self.applied += 1
+        return super().apply_goals(bucket, goals)
+
+
+class LimitCounter(Coverpoint):
+    def setup(self, ctx):
+        self.limit = ctx.limit
+        self.add_axis(name="value", values=list(range(10)), description="Value")
+        self.add_goal("HIGH", "Above the limit")
+
+    def apply_goals(self, bucket, goals):
+        if int(bucket.value) >= self.limit:
+            return goals.HIGH
+
+
+def point_top(point, **kwargs):
+    class PointTop(Covertop):
+        NAME = "top"
+
+        def setup(self, ctx):
+            self.add_coverpoint(point, name="cross")
+
+    return PointTop(**kwargs)
+
+
+class TestGoalRules:
+    def test_goal_rules(self):
+        """Check that goal rules match the equivalent apply_goals"""
+        reading = PointReader("").read(point_top(Cross()))
+        rule_reading = PointReader("").read(point_top(RuleCross()))
+
+        assert rule_reading.get_def_sha() == reading.get_def_sha()
+        assert list(rule_reading.iter_bucket_goals()) == list(
+            reading.iter_bucket_goals()
+        )
+
+    def test_lazy_goals(self):
+        """Check that lazy goals are only resolved when required"""
+        point = CountingCross()
+        point.applied = 0
+        cvg = point_top(point, lazy_goals=True, except_on_illegal=True)
+        assert point.applied == 0
+
+        cvg.sample({"a": 1, "b": 3})
+        cvg.sample({"a": 1, "b": 4})
+        assert point.applied == 1
+        with pytest.raises(RuntimeError):
+            cvg.sample({"a": 2, "b": 3})
+
+        reading = PointReader("").read(cvg)
+        assert point.applied == 6
+        eager_reading = PointReader("").read(point_top(Cross()))
+        assert reading.get_def_sha() == eager_reading.get_def_sha()
+
+
+class TestParallelBuild:
+    def test_build_workers(self):
+        """Check that coverage built by workers matches coverage built serially"""
+        reading = PointReader("").read(Top())
+        parallel_reading = PointReader("").read(Top(build_workers=2))
+
+        assert parallel_reading.get_def_sha() == reading.get_def_sha()
+        assert list(parallel_reading.iter_bucket_goals()) == list(
+            reading.iter_bucket_goals()
+        )
+
+
+class TestDefinitionCache:
+    def test_definition_cache(self, tmp_path):
+        """Check that cached goals are loaded rather than resolved again"""
+        eager_reading = PointReader("").read(point_top(Cross()))
+
+        for applied in [6, 0]:
+            point = CountingCross()
+            point.applied = 0
+            cvg = point_top(point, definition_cache=tmp_path, except_on_illegal=True)
+            assert point.applied == applied
+
+            cvg.sample({"a": 1, "b": 3})
+            with pytest.raises(RuntimeError):
+                cvg.sample({"a": 2, "b": 3})
+
+            reading = PointReader("").read(cvg)
+            assert reading.get_def_sha() == eager_reading.get_def_sha()
+            assert list(reading.iter_bucket_goals()) == list(
+                eager_reading.iter_bucket_goals()
+            )
+
+    def test_definition_cache_params(self, tmp_path):
+        """Check that coverpoints with different parameters are cached separately"""
+        for param, applied in [(1, 6), (2, 6), (1, 0)]:
+            point = CountingCross()
+            point.applied = 0
+            point.param = param
+            point_top(point, definition_cache=tmp_path)
+            assert point.applied == applied
+
+    def test_definition_cache_setup(self, tmp_path):
+        """Check that attributes set in setup from the context are part of the key"""
+        for limit in [3, 7]:
+            with CoverageContext(limit=limit):
+                cached = point_top(LimitCounter(), definition_cache=tmp_path)
+                uncached = point_top(LimitCounter())
+            assert cached.cross._cvg_goals.tolist() == [0] * limit + [1] * (10 - limit)
+            assert (
+                PointReader("").read(cached).get_def_sha()
+                == PointReader("").read(uncached).get_def_sha()
+            )
+        assert len(list(tmp_path.glob("*.goals"))) == 2
+
+    def test_definition_cache_malformed(self, tmp_path):
+        """Check that truncated or corrupt cache entries are rebuilt"""
+        point = CountingCross()
+        point.applied = 0
+        point_top(point, definition_cache=tmp_path)
+        (entry,) = tmp_path.glob("*.goals")
+        content = entry.read_bytes()
+
+        for malformed in [content[:10], content[:-1], b"NOTGOALS" + content[8:]]:
+            entry.write_bytes(malformed)
+            point = CountingCross()
+            point.applied = 0
+            point_top(point, definition_cache=tmp_path)
+            assert point.applied == 6
+            assert entry.read_bytes() == content
+
+
+class TestSaturation:
+    @pytest.mark.parametrize("compile_hits", [False, True])
+    def test_illegal_check_only(self, compile_hits):
+        """Check that saturated coverpoints only check for illegal hits"""
+        cvg = Top(
+            skip_saturated=True, compile_hits=compile_hits, except_on_illegal=True
+        )
+        cross = cvg.group.cross
+        traces = [{"a": 0, "b": 0}] * 10 + [{"a": 2, "b": 10}] * 10
+        traces += [{"a": 1, "b": 0}, {"a": 1, "b": 10}] * 20
+        for trace in traces[:-1]:
+            cvg.sample(trace)
+        assert not cross._saturated
+        assert cross._target_buckets - cross._run_stats[2] == 1
+
+        cvg.sample(traces[-1])
+        assert cross._saturated
+        assert not cross._skip_sampling
+
+        cvg.sample({"a": 0, "b": 0})
+        assert bucket_hits(cvg) == [0, 10, 20, 20, 10, 0]
+        with pytest.raises(RuntimeError):
+            cvg.sample({"a": 2, "b": 0})
+        assert bucket_hits(cvg) == [0, 10, 20, 20, 10, 1]
+
+
+class TestRunStats:
+    @pytest.mark.parametrize("compile_hits", [False, True])
+    def test_run_stats(self, compile_hits):
+        """Check that run statistics kept as buckets are hit match a recount"""
+        cvg = Top(compile_hits=compile_hits)
+        cross = cvg.group.cross
+        for a, b in [(0, 0), (0, 0), (0, 15), (1, 3), (1, 3), (2, 12)] * 12:
+            cvg.sample({"a": a, "b": b})
+        cross.bucket.hit_many(a=[1, 1, 1], b=[12, 3, 3])
+
+        run_stats = list(cross._run_stats)
+        cross._count_run_stats()
+        assert run_stats == cross._run_stats == [10 + 20 + 1 + 10, 4, 3]
+
+
+class SparseCross(RuleCross):
+    SPARSE = True
+
+
+class HugeCross(Coverpoint):
+    NAME = "huge"
+    SPARSE = True
+
+    def setup(self, ctx):
+        for name in "abcd":
+            values = {f"{value:02}": value for value in range(100)}
+            self.add_axis(name=name, values=values, description=name)
+        self.add_goal("BAD", "Illegal bucket", illegal=True)
+        self.add_goal("LOW", "Low a", target=2)
+        self.add_goal_rule("BAD", a="00", b=["00", "01"])
+        self.add_goal_rule("LOW", a=slice(0, 10))
+
+    def sample(self, trace):
+        self.bucket.hit_values(*trace)
+
+
+class TestSparse:
+    traces = [{"a": a, "b": b} for a in range(2) for b in range(0, 20, 3)] * 3
+
+    def test_sparse_matches_dense(self):
+        """Check that sparse coverpoints match their dense equivalent"""
+        cvg = point_top(RuleCross())
+        cvg_sparse = point_top(SparseCross(), compile_hits=True)
+        for cover in (cvg, cvg_sparse):
+            cover.sample_batch(self.traces)
+
+        reading = PointReader("").read(cvg)
+        sparse_reading = PointReader("").read(cvg_sparse)
+        assert list(sparse_reading.iter_points()) == list(reading.iter_points())
+        assert list(sparse_reading.iter_point_hits()) == list(reading.iter_point_hits())
+
+        # Only buckets which were hit are read
+        bucket_hits = list(sparse_reading.iter_bucket_hits())
+        assert bucket_hits == [
+            bucket_hit for bucket_hit in reading.iter_bucket_hits() if bucket_hit.hits
+        ]
+        assert list(sparse_reading.iter_bucket_goals()) == [
+            bucket_goal
+            for bucket_goal in reading.iter_bucket_goals()
+            if bucket_goal.start in {bucket_hit.start for bucket_hit in bucket_hits}
+        ]
+
+    def test_sparse_columnar(self):
+        """Check that sparse coverpoints can be read into columns"""
+        cvg = point_top(SparseCross())
+        cvg.sample_batch(self.traces)
+        reading = PointReader("").read(cvg)
+        columnar = PointReader("", columnar=True).read(cvg)
+        # Only buckets which were hit have rows, so their starts are stored
+        assert list(columnar.bucket_starts) == [
+            bucket_hit.start for bucket_hit in reading.iter_bucket_hits()
+        ]
+        for start, end in [(0, None), (5, 30)]:
+            assert list(columnar.iter_bucket_goals(start, end)) == list(
+                reading.iter_bucket_goals(start, end)
+            )
+            assert list(columnar.iter_bucket_hits(start, end)) == list(
+                reading.iter_bucket_hits(start, end)
+            )
+        assert isinstance(ColumnarReading.from_reading(reading).bucket_starts, array)
+
+    def test_sparse_streaming(self):
+        """Check that sparse coverpoints can be streamed"""
+        cvg = point_top(SparseCross())
+        cvg.sample_batch(self.traces)
+        reading = PointReader("").read(cvg)
+        stream = PointReader("").stream(cvg)
+        for start, end in [(0, None), (5, 30)]:
+            assert list(stream.iter_bucket_goals(start, end)) == list(
+                reading.iter_bucket_goals(start, end)
+            )
+            assert list(stream.iter_bucket_hits(start, end)) == list(
+                reading.iter_bucket_hits(start, end)
+            )
+
+    @pytest.mark.skipif(not node_strips_types(), reason="node cannot run TypeScript")
+    def test_sparse_viewer(self, tmp_path):
+        """Check that the viewer finds the buckets of sparse coverpoints by start"""
+        cvg = point_top(SparseCross())
+        cvg.sample_batch([{"a": 1, "b": b} for b in range(0, 20, 3)])
+        reading = PointReader("").read(cvg)
+        json_path = tmp_path / "coverage.json"
+        JSONWriter(json_path).write(reading)
+        script_path = tmp_path / "read.mjs"
+        script_path.write_text(VIEWER_SCRIPT % VIEWER_READERS.as_uri())
+
+        # Only buckets 2 and 3 were hit, so have rows 0 and 1
+        ranges = [(0, None), (0, 2), (0, 3), (3, 6)]
+        result = subprocess.run(
+            ["node", "--experimental-strip-types", script_path, json_path]
+            + [json.dumps(ranges)],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        assert json.loads(result.stdout) == [
+            [
+                [list(row) for row in reading.iter_bucket_goals(start, end)],
+                [list(row) for row in reading.iter_bucket_hits(start, end)],
+            ]
+            for start, end in ranges
+        ]
+
+    def test_sparse_unhit(self):
+        """Check that a sparse coverpoint with no hits reads no buckets"""
+        reading = PointReader("").read(point_top(SparseCross()))
+        assert reading.bucket_goals == reading.bucket_hits == []
+        assert len(reading.points) == 2
+
+    def test_huge_cross(self):
+        """Check that huge sparse coverpoints are counted from their goal rules"""
+        cvg = point_top(HugeCross(), except_on_illegal=True)
+        huge = cvg.cross
+        assert huge._bucket_count == 100**4
+        # LOW is 10 values of a, less the 2 * 100 * 100 BAD buckets
+        low_buckets = 10 * 100**3 - 2 * 100**2
+        default_buckets = 90 * 100**3
+        assert huge._target_totals() == (
+            2 * low_buckets + 10 * default_buckets,
+            low_buckets + default_buckets,
+        )
+
+        for trace in [(1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (50, 0, 0, 0)]:
+            cvg.sample(trace)
+        with pytest.raises(RuntimeError):
+            cvg.sample((0, 1, 2, 3))
+        assert huge._run_stats == [3, 2, 1]
+
+        reading = PointReader("").read(cvg)
+        goal_names = [goal.name for goal in reading.iter_goals()]
+        assert [
+            (bucket_hit.start, goal_names[bucket_goal.goal], bucket_hit.hits)
+            for bucket_goal, bucket_hit in zip(
+                reading.iter_bucket_goals(), reading.iter_bucket_hits(), strict=True
+            )
+        ] == [(10203, "BAD", 1), (1020304, "LOW", 3), (50000000, "DEFAULT", 1)]
+
+    def test_merge_sparse(self, tmp_path):
+        """Check that sparse readings hitting different buckets are merged"""
+        paths = []
+        for traces in [[(1, 2, 3, 4)] * 3, [(1, 2, 3, 4), (50, 0, 0, 0)]]:
+            cvg = point_top(HugeCross())
+            for trace in traces:
+                cvg.sample(trace)
+            paths.append(tmp_path / f"{len(paths)}.db")
+            SQLAccessor.File(paths[-1]).write(PointReader("").read(cvg))
+
+        merged = SQLAccessor.merge_files(paths)
+        assert [
+            (bucket_hit.start, bucket_hit.hits)
+            for bucket_hit in merged.iter_bucket_hits()
+        ] == [(1020304, 4), (50000000, 1)]
+        point_hit = next(merged.iter_point_hits(depth=1))
+        assert (point_hit.hits, point_hit.hit_buckets, point_hit.full_buckets) == (
+            3,
+            2,
+            1,
+        )
+
+
+class TestSharedDefinitions:
+    def test_shared_axes_and_goals(self):
+        """Check that coverpoints with equal axes and goals share them"""
+        cvg = point_top(Cross())
+        other = point_top(Cross())
+        for axis, other_axis in zip(cvg.cross._axes, other.cross._axes, strict=True):
+            assert axis is other_axis
+        for goal, other_goal in zip(
+            cvg.cross._goal_list, other.cross._goal_list, strict=True
+        ):
+            assert goal is other_goal
+
+    def test_unequal_values_not_shared(self):
+        """Check that axes with the same value names but different values are kept"""
+
+        class RenamedCross(Cross):
+            def setup(self, ctx):
+                self.add_axis(name="a", values=[0, 1, 2], description="a")
+                self.add_axis(
+                    name="b", values={"lo": [0, 4], "hi": [5, 19]}, description="b"
+                )
+                self.add_goal("SKIP", "Ignored bucket", ignore=True)
+                self.add_goal("BAD", "Illegal bucket", illegal=True)
+                self.add_goal("MANY", "Lots of hits", target=20)
+
+        cvg = point_top(Cross())
+        renamed = point_top(RenamedCross())
+        assert cvg.cross._axes[0] is renamed.cross._axes[0]
+        assert cvg.cross._axes[1] is not renamed.cross._axes[1]
+        renamed.sample({"a": 1, "b": 7})
+        assert bucket_hits(renamed) == [0, 0, 1, 0, 0, 0]
@@ -0,0 +1,896 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023-2025 Vypercore. All Rights Reserved
+
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from bucket import Covergroup, Coverpoint, Covertop
+from bucket.axis import Axis, AxisUnrecognisedValue
+from bucket.base import CoverBase
+from bucket.goal import GoalItem
+from bucket.rw import (
+    CheckpointReader,
+    ColumnarReading,
+    ConsoleWriter,
+    JSONWriter,
+    MergeReading,
+    PointReader,
+    SQLAccessor,
+)
+from bucket.rw.common import (
+    AxisTuple,
+    GoalTuple,
+    PointHitTuple,
+    PointTuple,
+    PuppetReading,
+    iter_chunks,
+)
+from bucket.rw.flatchain import FlatChain
+from bucket.triggers import CoverageTriggers, EveryNth, Probability, TimeBudget
+
+
+class Counter(Coverpoint):
+    def setup(self, ctx):
+        self.add_axis(name="kind", values=["a", "b"], description="Trace kind")
+        self.sampled = 0
+
+    def sample(self, trace):
+        self.sampled += 1
+        self.bucket.hit(kind=trace)
+
+
+class HighTierCounter(Counter):
+    TIER = 2
+
+
+class KindGroup(Covergroup):
+    def __init__(self, kind):
+        self.kind = kind
+
+    def setup(self, ctx):
+        self.add_coverpoint(Counter(), name="point_0")
+        self.add_coverpoint(HighTierCounter(), name="point_1")
+
+    def should_sample(self, trace):
+        return trace == self.kind
+
+
+class Top(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(KindGroup("a"), name="group_a")
+        self.add_covergroup(KindGroup("b"), name="group_b")
+        self.add_coverpoint(Counter(), name="point_top")
+
+
+def sample_counts(cvg):
+    return {
+        "a0": cvg.group_a.point_0.sampled,
+        "a1": cvg.group_a.point_1.sampled,
+        "b0": cvg.group_b.point_0.sampled,
+        "b1": cvg.group_b.point_1.sampled,
+        "top": cvg.point_top.sampled,
+    }
+
+
+class TestSamplePlan:
+    def test_should_sample(self):
+        """Check that covergroups only pass on traces they should sample"""
+        cvg = Top()
+        for trace in ["a", "a", "b"]:
+            cvg.sample(trace)
+        assert sample_counts(cvg) == {"a0": 2, "a1": 2, "b0": 1, "b1": 1, "top": 3}
+
+    def test_filter_after_sampling(self):
+        """Check that filters and tier levels apply after sampling has started"""
+        cvg = Top()
+        cvg.sample("a")
+
+        cvg.exclude_by_name("group_b")
+        cvg.sample("a")
+        cvg.sample("b")
+        assert sample_counts(cvg) == {"a0": 2, "a1": 2, "b0": 0, "b1": 0, "top": 3}
+
+        cvg.set_tier_level(1)
+        cvg.sample("a")
+        assert sample_counts(cvg) == {"a0": 3, "a1": 2, "b0": 0, "b1": 0, "top": 4}
+
+
+class GatedTop(Top):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def process_trace(self, trace):
+        self.started.set()
+        self.release.wait()
+        return trace
+
+
+class TestBackgroundSampling:
+    def test_background_sampling(self):
+        """Check that traces sampled in the background are all sampled by flush"""
+        cvg = Top(background_sampling=True, queue_size=2)
+        for trace in ["a", "a", "b"]:
+            cvg.sample(trace)
+        cvg.sample_batch(["b", "b"])
+        cvg.flush()
+        assert sample_counts(cvg) == {"a0": 2, "a1": 2, "b0": 3, "b1": 3, "top": 5}
+
+        reading = PointReader("").read(cvg)
+        cvg.sample("a")
+        assert PointReader("").read(cvg).get_def_sha() == reading.get_def_sha()
+        assert cvg.point_top.sampled == 6
+
+    def test_drop(self):
+        """Check that traces are dropped and counted when the queue is full"""
+        cvg = GatedTop(background_sampling=True, queue_size=1, backpressure="drop")
+        cvg.sample("a")
+        cvg.started.wait()
+        cvg.sample("a")
+        cvg.sample("a")
+        cvg.release.set()
+        cvg.flush()
+        assert cvg.dropped_traces == 1
+        assert cvg.point_top.sampled == 2
+
+    def test_background_error(self):
+        """Check that errors raised in the background are raised by flush"""
+        cvg = Top(background_sampling=True)
+        cvg.sample("c")
+        cvg.sample("a")
+        with pytest.raises(AxisUnrecognisedValue):
+            cvg.flush()
+        assert cvg.point_top.sampled == 2
+
+    def test_close(self):
+        """Check that closing flushes the coverage and stops the worker"""
+        with Top(background_sampling=True) as cvg:
+            cvg.sample_batch(["a", "b"])
+            worker = cvg._sample_worker
+            assert worker.is_alive()
+        assert not worker.is_alive()
+        assert cvg._sample_worker is None
+        assert cvg.point_top.sampled == 2
+
+        # Sampling again starts a new worker
+        cvg.sample("a")
+        cvg.close()
+        assert cvg.point_top.sampled == 3
+
+    def test_close_error(self):
+        """Check that the worker is stopped even if sampling failed"""
+        cvg = Top(background_sampling=True)
+        cvg.sample("c")
+        worker = cvg._sample_worker
+        with pytest.raises(AxisUnrecognisedValue):
+            cvg.close()
+        assert not worker.is_alive()
+
+
+def bucket_hits(cvg):
+    return list(PointReader("").read(cvg).iter_bucket_hits())
+
+
+class TestShardedSampling:
+    traces = ["a", "b", "a", "b", "b", "a", "a"]
+
+    def test_sample_workers(self):
+        """Check that coverage sampled across shards matches a single process"""
+        cvg = Top()
+        sharded_cvg = Top(sample_workers=2, shard_batch_size=3)
+        for trace in self.traces:
+            cvg.sample(trace)
+            sharded_cvg.sample(trace)
+        assert bucket_hits(sharded_cvg) == bucket_hits(cvg)
+
+        # Sampling continues after the shards have been gathered
+        cvg.exclude_by_name("point_top")
+        sharded_cvg.exclude_by_name("point_top")
+        cvg.sample_batch(self.traces)
+        sharded_cvg.sample_batch(self.traces)
+        assert bucket_hits(sharded_cvg) == bucket_hits(cvg)
+
+    def test_shard_error(self):
+        """Check that errors raised in shards are raised by flush"""
+        cvg = Top(sample_workers=2)
+        cvg.sample("a")
+        cvg.sample("c")
+        with pytest.raises(AxisUnrecognisedValue):
+            cvg.flush()
+        assert cvg.point_top._cvg_hits.tolist() == [1, 0]
+
+
+class PlainGroup(Covergroup):
+    def setup(self, ctx):
+        self.add_coverpoint(Counter(), name="point_0")
+
+
+class PlainTop(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(PlainGroup(), name="group")
+
+
+class TestProfile:
+    def test_profile_report(self, capsys):
+        """Check that sampling calls and hits are recorded for each node"""
+        cvg = Top(profile=True)
+        for trace in ["a", "a", "b"]:
+            cvg.sample(trace)
+
+        report = {row.path: row for row in cvg.profile_report()}
+        assert {path: row.calls for path, row in report.items()} == {
+            "top.group_a": 3,
+            "top.group_a.point_0": 2,
+            "top.group_a.point_1": 2,
+            "top.group_b": 3,
+            "top.group_b.point_0": 1,
+            "top.group_b.point_1": 1,
+            "top.point_top": 3,
+        }
+        assert report["top.group_a"].hits == 4
+        assert report["top.point_top"].hits == 3
+        assert report["top.point_top"].kind == "point"
+        assert report["top.point_top"].time >= report["top.point_top"].max_time > 0
+
+        ConsoleWriter().write_profile(report.values())
+        assert "Sampling Profile" in capsys.readouterr().out
+
+    def test_profile_interval(self):
+        """Check that only every Nth call is timed, while all calls are counted"""
+        cvg = Top(profile=True, profile_interval=2)
+        for trace in ["a", "a", "b"]:
+            cvg.sample(trace)
+        assert cvg._profile[cvg.point_top].calls == 3
+        assert cvg._profile[cvg.point_top].timed_calls == 1
+        assert cvg._profile[cvg.group_b.point_0].timed_calls == 0
+
+    @pytest.mark.parametrize(
+        "kwargs", [{}, {"sample_workers": 2, "shard_batch_size": 2}]
+    )
+    def test_profile_batches(self, kwargs):
+        """Check that batches, including those sampled by shards, are profiled"""
+        cvg = Top(profile=True, **kwargs)
+        cvg.sample_batch(["a", "a", "b"])
+        cvg.sample("a")
+
+        report = {row.path: row for row in cvg.profile_report()}
+        assert {path: row.calls for path, row in report.items()} == {
+            "top.group_a": 4,
+            "top.group_a.point_0": 3,
+            "top.group_a.point_1": 3,
+            "top.group_b": 4,
+            "top.group_b.point_0": 1,
+            "top.group_b.point_1": 1,
+            "top.point_top": 4,
+        }
+        assert report["top.point_top"].time >= report["top.point_top"].max_time > 0
+
+    def test_profile_unguarded(self, capsys):
+        """Check that covergroups without should_sample are reported as such"""
+        cvg = PlainTop(profile=True)
+        cvg.sample("a")
+        cvg.sample_batch(["b"])
+
+        report = {row.path: row for row in cvg.profile_report()}
+        assert report["top.group"].calls is None
+        assert report["top.group"].time is None
+        assert report["top.group"].hits == 2
+        assert report["top.group.point_0"].calls == 2
+
+        ConsoleWriter().write_profile(report.values())
+        assert "top.group" in capsys.readouterr().out
+
+
+class TestSaturation:
+    def test_skip_saturated(self):
+        """Check that saturated coverpoints are no longer sampled"""
+        cvg = Top(skip_saturated=True)
+        for trace in ["a", "b"] * 10:
+            cvg.sample(trace)
+        assert cvg.point_top._skip_sampling
+        assert not cvg.group_a._sampling_saturated()
+
+        cvg.sample("a")
+        cvg.sample_batch(["a", "b"])
+        assert sample_counts(cvg) == {
+            "a0": 12,
+            "a1": 12,
+            "b0": 11,
+            "b1": 11,
+            "top": 20,
+        }
+
+    def test_saturated_group(self):
+        """Check that covergroups are skipped once all their children are saturated"""
+        cvg = Top(skip_saturated=True)
+        for trace in ["a", "b"] * 10:
+            cvg.sample(trace)
+        cvg.group_a.point_0._saturate()
+        cvg.group_a.point_1._saturate()
+        assert cvg.group_a._sampling_saturated()
+        cvg._build_sample_plan()
+        assert all(
+            function.__self__ is not cvg.group_a for function, _ in cvg._sample_plan
+        )
+
+    def test_unsaturated_count(self):
+        """Check the count of coverpoints still to be sampled below each covergroup"""
+        cvg = Top(skip_saturated=True)
+        assert (cvg._unsaturated, cvg.group_a._unsaturated) == (5, 2)
+        for trace in ["a", "b"] * 10:
+            cvg.sample(trace)
+        assert (cvg._unsaturated, cvg.group_a._unsaturated) == (4, 2)
+        cvg.group_a.point_0._saturate()
+        cvg.group_a.point_0._saturate()
+        assert (cvg._unsaturated, cvg.group_a._unsaturated) == (3, 1)
+        cvg.group_a.point_1._saturate()
+        assert (cvg._unsaturated, cvg.group_a._unsaturated) == (2, 0)
+        assert cvg.group_b._unsaturated == 2
+
+
+class SometimesCounter(Counter):
+    TRIGGER = CoverageTriggers.SOMETIMES
+
+
+class OccasionalGroup(KindGroup):
+    TRIGGER = CoverageTriggers.OCCASSIONALLY
+
+
+class TriggerTop(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(OccasionalGroup("a"), name="group_a")
+        self.add_coverpoint(SometimesCounter(), name="point_sometimes")
+        self.add_coverpoint(Counter(), name="point_all")
+
+
+class TestTriggers:
+    def test_default_rates(self):
+        """Check that coverage is sampled at the default rate for each trigger"""
+        cvg = TriggerTop()
+        for _ in range(101):
+            cvg.sample("a")
+        assert cvg.point_all.sampled == 101
+        assert cvg.point_sometimes.sampled == 11
+        assert cvg.group_a.point_0.sampled == 2
+
+    def test_trigger_rates(self):
+        """Check that the rate for each trigger can be changed"""
+        cvg = TriggerTop(
+            trigger_rates={
+                CoverageTriggers.SOMETIMES: EveryNth(2),
+                CoverageTriggers.OCCASSIONALLY: Probability(0),
+            }
+        )
+        for _ in range(5):
+            cvg.sample("a")
+        cvg.sample_batch(["a", "b", "a", "b"])
+        assert cvg.point_all.sampled == 9
+        # Each trace of a batch is triggered on its own
+        assert cvg.point_sometimes.sampled == 5
+        assert cvg.point_sometimes._cvg_hits.tolist() == [5, 0]
+        assert cvg.group_a.point_0.sampled == 0
+
+    def test_time_budget(self):
+        """Check that sampling stops once the time budget is used"""
+        cvg = TriggerTop(trigger_rates={CoverageTriggers.SOMETIMES: TimeBudget(1e-9)})
+        for _ in range(5):
+            cvg.sample("a")
+        cvg.sample_batch(["a"] * 5)
+        assert cvg.point_sometimes.sampled == 2
+
+    def test_batch_rates(self):
+        """Check that traces sampled in batches or shards are triggered one by one"""
+        for kwargs in [{}, {"sample_workers": 2, "shard_batch_size": 7}]:
+            cvg = TriggerTop(**kwargs)
+            cvg.sample_batch(["a"] * 95)
+            cvg.sample_batch(["a"] * 6)
+            cvg.flush()
+            assert cvg.point_sometimes._cvg_hits.tolist() == [11, 0]
+
+
+class DictCounter(Counter):
+    def sample(self, trace):
+        self.sampled += 1
+        self.bucket.hit(kind=trace["kind"])
+
+
+class RoutedCounter(DictCounter):
+    ROUTE_KEY = "kind"
+    ROUTE_VALUES = ["b"]
+
+
+class RoutedGroup(Covergroup):
+    ROUTE_KEY = "kind"
+    ROUTE_VALUES = ["a"]
+
+    def setup(self, ctx):
+        self.add_coverpoint(DictCounter(), name="point_0")
+        self.add_coverpoint(DictCounter(), name="point_1")
+
+
+class RoutedTop(Covertop):
+    NAME = "top"
+
+    def setup(self, ctx):
+        self.add_covergroup(RoutedGroup(), name="group_a")
+        self.add_coverpoint(RoutedCounter(), name="point_b")
+
+
+class TestRouting:
+    traces = [{"kind": "a"}, {"kind": "b"}, {"kind": "b"}, {}, {"kind": "c"}]
+
+    def route_counts(self, cvg):
+        return {
+            "a0": cvg.group_a.point_0.sampled,
+            "b": cvg.point_b.sampled,
+        }
+
+    def test_route_plans(self):
+        """Check that traces only reach the coverpoints routed to them"""
+        cvg = RoutedTop()
+        for trace in self.traces:
+            cvg.sample(trace)
+        assert self.route_counts(cvg) == {"a0": 1, "b": 2}
+        # One plan for each accepted route value, and one for the rest
+        assert len(cvg._route_plans) == 3
+
+        cvg.exclude_by_name("point_b")
+        cvg.sample({"kind": "b"})
+        assert self.route_counts(cvg) == {"a0": 1, "b": 2}
+
+    def test_route_batch(self):
+        """Check that batches are routed as traces are"""
+        cvg = RoutedTop()
+        cvg.sample_batch(self.traces)
+        assert self.route_counts(cvg) == {"a0": 1, "b": 2}
+
+    def test_unhashable_route(self):
+        """Check that traces with unhashable route values use the unrouted plan"""
+        cvg = RoutedTop()
+        cvg.sample({"kind": ["a"]})
+        cvg.sample_batch([{"kind": {"b": 1}}])
+        for trace in self.traces:
+            cvg.sample(trace)
+        assert self.route_counts(cvg) == {"a0": 1, "b": 2}
+        assert len(cvg._route_plans) == 3
+
+        class SetRoutedCounter(RoutedCounter):
+            ROUTE_VALUES = frozenset(["b"])
+
+        assert not SetRoutedCounter()._route_accepts({"kind": ["b"]})
+
+    def test_unrouted_plan(self):
+        """Check that the plan for unknown routes guards each route"""
+        cvg = RoutedTop()
+        cvg._build_sample_plan()
+        plan = cvg._sample_plan
+        assert [skip for _, skip in plan] == [2, None, 5, None, None]
+
+
+class TestProgress:
+    def test_progress_matches_reading(self):
+        """Check that progress summaries match the coverage read for each group"""
+        cvg = Top()
+        for trace in ["a", "b", "a"] * 4:
+            cvg.sample(trace)
+
+        reading = PointReader("").read(cvg)
+        expected = [
+            (point.target, hit.hits, point.target_buckets)
+            + (hit.hit_buckets, hit.full_buckets)
+            for point, hit in zip(reading.iter_points(), reading.iter_point_hits())
+            if point.end != point.start + 1
+        ]
+        groups = cvg.progress().groups
+        assert [group.path for group in groups] == ["top", "top.group_a", "top.group_b"]
+        assert [tuple(group)[1:] for group in groups] == expected
+
+    def test_report_progress(self, tmp_path, caplog):
+        """Check that progress is reported every N samples"""
+        reports = []
+        cvg = Top().report_progress(every_samples=2, callback=reports.append)
+        for trace in ["a", "b", "a"]:
+            cvg.sample(trace)
+        cvg.sample_batch(["b", "b"])
+        assert [report.samples for report in reports] == [2, 5]
+        assert reports[-1].groups[0].hits == 15
+
+        path = tmp_path / "progress.jsonl"
+        cvg.report_progress(every_samples=1, path=path)
+        cvg.sample("a")
+        cvg.sample("a")
+        assert len(path.read_text().splitlines()) == 2
+
+        cvg.report_progress(every_seconds=1e-9)
+        with caplog.at_level("INFO"):
+            cvg.sample("a")
+        assert "Progress after 1 samples: top.group_a" in caplog.text
+
+
+class TestCheckpoint:
+    @pytest.mark.parametrize("compile_hits", [False, True])
+    def test_checkpoint_matches_reading(self, tmp_path, compile_hits):
+        """Check that the coverage read from checkpoints matches the coverage"""
+        path = tmp_path / "coverage.journal"
+        cvg = Top(checkpoint_path=path, compile_hits=compile_hits)
+        for trace in ["a", "b", "a"] * 4:
+            cvg.sample(trace)
+        cvg.checkpoint()
+        first = PointReader("").read(cvg)
+        cvg.sample_batch(["b"] * 5)
+        cvg.checkpoint()
+
+        reading = PointReader("").read(cvg)
+        for checkpoint_reading, expected in [
+            (CheckpointReader(path).read(), reading),
+            (CheckpointReader(path).read(1), first),
+        ]:
+            assert checkpoint_reading.get_def_sha() == expected.get_def_sha()
+            for table in ["points", "goals", "bucket_goals", "point_hits"]:
+                assert getattr(checkpoint_reading, table) == list(
+                    getattr(expected, f"iter_{table}")()
+                )
+            assert checkpoint_reading.bucket_hits == list(expected.iter_bucket_hits())
+
+    def test_checkpoint_delta(self, tmp_path):
+        """Check that checkpoints only contain buckets changed since the last"""
+        path = tmp_path / "coverage.journal"
+        cvg = Top(checkpoint_path=path, checkpoint_samples=3)
+        for trace in ["a", "a", "a", "b", "b", "b", "b"]:
+            cvg.sample(trace)
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        # point_top and group_a hit "a", then point_top and group_b hit "b"
+        assert [
+            [start for start, *_ in json.loads(line)["bucket_hit"]]
+            for line in lines[1:]
+        ] == [[0, 2, 4], [1, 7, 9]]
+
+        # A checkpoint left partially written is ignored
+        with path.open("a") as f:
+            f.write('{"samples": 7, "point_hit": [[1')
+        assert CheckpointReader(path).read().bucket_hits[9].hits == 3
+
+    def test_checkpoint_merge(self, tmp_path):
+        """Check that recovered coverage can be merged with exported coverage"""
+        path = tmp_path / "coverage.journal"
+        cvg = Top(checkpoint_path=path, checkpoint_context_sha="context")
+        exported_cvg = Top()
+        for trace in ["a", "b", "a"]:
+            cvg.sample(trace)
+            exported_cvg.sample(trace)
+        cvg.checkpoint()
+
+        recovered = CheckpointReader(path).read()
+        exported = PointReader("context").read(exported_cvg)
+        assert recovered.get_rec_sha() == "context"
+        merged = MergeReading(recovered, exported)
+        assert [hit.hits for hit in merged.iter_bucket_hits()] == [
+            2 * hit.hits for hit in exported.iter_bucket_hits()
+        ]
+
+    def test_checkpoint_shards(self, tmp_path):
+        """Check that checkpoints gather hits without stopping the shards"""
+        path = tmp_path / "coverage.journal"
+        cvg = Top()
+        sharded_cvg = Top(sample_workers=2, checkpoint_path=path)
+        for trace in ["a", "b", "a", "b", "b"]:
+            cvg.sample(trace)
+            sharded_cvg.sample(trace)
+        sharded_cvg.checkpoint()
+        assert sharded_cvg._shards is not None
+        assert CheckpointReader(path).read().bucket_hits == bucket_hits(cvg)
+
+        cvg.sample("a")
+        sharded_cvg.sample("a")
+        sharded_cvg.checkpoint()
+        assert CheckpointReader(path).read().bucket_hits == bucket_hits(cvg)
+        assert bucket_hits(sharded_cvg) == bucket_hits(cvg)
+
+
+class NestedTop(Covertop):
+    NAME = "nested"
+
+    def setup(self, ctx):
+        self.add_covergroup(Top(), name="inner")
+        self.add_coverpoint(Counter(), name="point")
+
+
+class TestFlatChain:
+    def test_matches_linked_chain(self):
+        """Check that the flat chain matches the chain of links"""
+        cvg = NestedTop()
+        for trace in ["a", "b", "a", "a"]:
+            cvg.sample(trace)
+
+        def_chain = cvg._chain_def()
+        run_chain = cvg._chain_run()
+
+        def link_order(link):
+            return (link.start.point, link.depth)
+
+        chain = FlatChain(cvg)
+        def_sha, points, axes, goals = chain.definition()
+        assert def_sha == def_chain.end.sha.hexdigest()
+        assert points == [
+            PointTuple.from_link(link)
+            for link in sorted(def_chain.index.iter(CoverBase), key=link_order)
+        ]
+        assert axes == [
+            AxisTuple.from_link(link) for link in def_chain.index.iter(Axis)
+        ]
+        assert goals == [
+            GoalTuple.from_link(link) for link in def_chain.index.iter(GoalItem)
+        ]
+        assert chain.run() == [
+            PointHitTuple.from_link(link)
+            for link in sorted(run_chain.index.iter(CoverBase), key=link_order)
+        ]
+
+
+class TestDefinitionTables:
+    def test_cached_between_reads(self):
+        """Check the definition is kept between reads, while hits are re-read"""
+        cvg = NestedTop()
+        cvg.sample("a")
+        first = PointReader("").read(cvg)
+        tables = cvg._definition_tables()
+        cvg.sample("b")
+        second = PointReader("").read(cvg)
+        assert cvg._definition_tables() is tables
+
+        # The cached definition matches one read from the tree afresh
+        fresh = CoverBase._definition_tables(cvg)
+        assert second.get_def_sha() == fresh.def_sha == first.get_def_sha()
+        assert second.points == fresh.points
+        assert second.axis_values == fresh.axis_values
+        assert [bucket_goal.goal for bucket_goal in second.bucket_goals] == [
+            goal for goals in fresh.goal_columns for goal in goals
+        ]
+        assert second.point_hits == fresh.chain.run() != first.point_hits
+        assert second.bucket_hits != first.bucket_hits
+
+    def test_invalidated_by_tree_change(self):
+        """Check the definition is rebuilt if coverage is added to the tree"""
+        cvg = NestedTop()
+        before = PointReader("").read(cvg)
+        cvg.inner.group_a.add_coverpoint(Counter(), name="point_late")
+        after = PointReader("").read(cvg)
+        assert after.get_def_sha() != before.get_def_sha()
+        assert len(after.points) == len(before.points) + 1
+
+    @pytest.mark.parametrize("kwargs", [{}, {"skip_saturated": True}])
+    def test_sample_late_coverage(self, kwargs):
+        """Check coverage added to the tree after sampling has started is sampled"""
+        cvg = Top(**kwargs)
+        cvg.sample("a")
+        cvg.group_a.add_coverpoint(Counter(), name="point_late")
+        assert (cvg._unsaturated, cvg.group_a._unsaturated) == (6, 3)
+        cvg.sample("a")
+        cvg.sample_batch(["a", "b"])
+        assert cvg.group_a.point_late.sampled == 2
+        assert cvg.group_a.point_late._cvg_hits.tolist() == [2, 0]
+
+    def test_kept_after_other_tree_change(self):
+        """Check the definition is kept if coverage is added to another tree"""
+        cvg = NestedTop()
+        tables = cvg._definition_tables()
+        NestedTop().inner.group_a.add_coverpoint(Counter(), name="point_late")
+        assert cvg._definition_tables() is tables
+        # Changes below a covertop nested in another are seen by both
+        inner_tables = cvg.inner._definition_tables()
+        cvg.inner.group_a.add_coverpoint(Counter(), name="point_late")
+        assert cvg.inner._definition_tables() is not inner_tables
+        assert cvg._definition_tables() is not tables
+
+
+class Chain(Covergroup):
+    def __init__(self, depth: int):
+        self.depth = depth
+
+    def setup(self, ctx):
+        self.add_coverpoint(Counter(), name="point")
+        if self.depth:
+            self.add_covergroup(Chain(self.depth - 1), name="chain")
+
+
+class DeepTop(Covertop):
+    NAME = "deep"
+
+    def setup(self, ctx):
+        self.add_covergroup(Chain(1200), name="chain")
+
+
+class TestTraversal:
+    def test_deep_tree(self):
+        """Check trees deeper than the recursion limit can be sampled and read"""
+        limit = sys.getrecursionlimit()
+        # Building the tree still recurses through each covergroup's setup
+        sys.setrecursionlimit(20000)
+        try:
+            cvg = DeepTop()
+        finally:
+            sys.setrecursionlimit(limit)
+
+        cvg.sample("a")
+        cvg.sample_batch(["b", "b"])
+        cvg.exclude_by_name(["chain.point"])
+        cvg.set_tier_level(1)
+        cvg.report_progress(every_samples=1, callback=lambda report: None)
+        cvg.sample("a")
+        reading = PointReader("").read(cvg)
+        assert len(reading.points) == 2 * 1201 + 1
+        # Every coverpoint matches, so the last sample was not counted
+        assert reading.point_hits[0].hits == 1201 * 3
+        assert cvg._chain_run().end.hits == reading.point_hits[0].hits
+
+    def test_print_tree(self, caplog):
+        """Check the tree is printed with each level indented below its parent"""
+        with caplog.at_level("INFO"):
+            NestedTop().print_tree()
+        assert [record.getMessage() for record in caplog.records] == [
+            "COVERAGE_TREE",
+            "[A](0) nested:  -- Tags:[]",
+            "[A](0)     |-- point:  -- Tags:[]",
+            "[A](0)     |-- inner:  -- Tags:[]",
+            "[A](0)             |-- point_top:  -- Tags:[]",
+            "[A](0)             |-- group_a:  -- Tags:[]",
+            "[A](0)                     |-- point_0:  -- Tags:[]",
+            "[A](2)                     |-- point_1:  -- Tags:[]",
+            "[A](0)             |-- group_b:  -- Tags:[]",
+            "[A](0)                     |-- point_0:  -- Tags:[]",
+            "[A](2)                     |-- point_1:  -- Tags:[]",
+        ]
+
+
+def reading_tables(reading, start=0, end=None):
+    return [
+        reading.get_def_sha(),
+        list(reading.iter_points()),
+        list(reading.iter_axes()),
+        list(reading.iter_axis_values()),
+        list(reading.iter_goals()),
+        list(reading.iter_point_hits()),
+        list(reading.iter_bucket_goals(start, end)),
+        list(reading.iter_bucket_hits(start, end)),
+    ]
+
+
+class TestColumnarReading:
+    def test_matches_reading(self, tmp_path):
+        """Check a columnar reading matches one of tuples, and can be written"""
+        cvg = NestedTop()
+        for trace in ["a", "b", "a", "a"]:
+            cvg.sample(trace)
+        reading = PointReader("").read(cvg)
+        columnar = PointReader("", columnar=True).read(cvg)
+        assert isinstance(columnar, ColumnarReading)
+        # Every bucket has a row, so starts are not stored
+        assert columnar.bucket_starts is None
+        for start, end in [(0, None), (3, 7), (8, 100)]:
+            assert reading_tables(columnar, start, end) == reading_tables(
+                reading, start, end
+            )
+        assert reading_tables(ColumnarReading.from_reading(reading)) == (
+            reading_tables(reading)
+        )
+
+        # Bulk accessors are slices of the columns
+        assert list(columnar.bucket_starts_array(3, 7)) == [3, 4, 5, 6]
+        assert columnar.bucket_hits_array(3, 7).obj is columnar.bucket_hits
+        assert list(columnar.bucket_hits_array(3, 7)) == [
+            bucket_hit.hits for bucket_hit in reading.iter_bucket_hits(3, 7)
+        ]
+
+        for name, written in [("tuples", reading), ("columns", columnar)]:
+            JSONWriter(tmp_path / f"{name}.json").write(written)
+        assert json.loads((tmp_path / "columns.json").read_text()) == json.loads(
+            (tmp_path / "tuples.json").read_text()
+        )
+
+
+class TestStreamingReading:
+    def test_matches_reading(self):
+        """Check a streaming reading matches a stored reading, over any range"""
+        cvg = NestedTop()
+        for trace in ["a", "b", "a", "a"]:
+            cvg.sample(trace)
+        reading = PointReader("").read(cvg)
+        stream = PointReader("").stream(cvg)
+        for start, end in [(0, None), (3, 7), (8, 100), (5, 5)]:
+            assert reading_tables(stream, start, end) == reading_tables(
+                reading, start, end
+            )
+        for start, end, depth in [(0, None, 0), (1, 3, 1)]:
+            assert list(stream.iter_points(start, end, depth)) == list(
+                reading.iter_points(start, end, depth)
+            )
+
+    def test_write_in_chunks(self, tmp_path):
+        """Check streaming readings are written the same as stored readings"""
+        cvg = NestedTop()
+        for trace in ["a", "b", "b"]:
+            cvg.sample(trace)
+        reading = PointReader("").read(cvg)
+        for written in [reading, PointReader("").stream(cvg)]:
+            JSONWriter(tmp_path / "coverage.json").write(written)
+            SQLAccessor.File(tmp_path / "coverage.db").write(written)
+
+        data = json.loads((tmp_path / "coverage.json").read_text())
+        assert data["definitions"][0] == data["definitions"][1]
+        for table in ["point_hit", "bucket_hit"]:
+            assert data["records"][0][table] == data["records"][1][table]
+        stored, streamed = SQLAccessor.File(tmp_path / "coverage.db").read_all()
+        assert reading_tables(streamed) == reading_tables(stored)
+
+    def test_hold_sampling(self):
+        """Check background sampling is held while a streamed reading is written"""
+        cvg = Top(background_sampling=True)
+        cvg.sample_batch(["a", "b"] * 3)
+        stream = PointReader("").stream(cvg)
+        cvg.sample_batch(["a"] * 3)
+        expected = Top()
+        expected.sample_batch(["a", "b"] * 3 + ["a"] * 3)
+
+        with stream.hold():
+            cvg.sample_batch(["b"] * 3)
+            # Wait for the worker to take the traces, which it cannot sample yet
+            while not cvg._sample_queue.empty():
+                time.sleep(0.001)
+            time.sleep(0.01)
+            # Traces queued before the hold are included, but not those since
+            assert reading_tables(stream) == reading_tables(
+                PointReader("").read(expected)
+            )
+        cvg.close()
+        expected.sample_batch(["b"] * 3)
+        assert bucket_hits(cvg) == bucket_hits(expected)
+
+    def test_hold_queue_full(self):
+        """Check sampling into a full queue while holding sampling raises"""
+        cvg = Top(background_sampling=True, queue_size=2)
+        stream = PointReader("").stream(cvg)
+        with stream.hold():
+            cvg.sample("a")
+            # The worker takes the first trace, so two more fill the queue
+            while not cvg._sample_queue.empty():
+                time.sleep(0.001)
+            cvg.sample("b")
+            cvg.sample("b")
+            with pytest.raises(RuntimeError):
+                cvg.sample("a")
+        cvg.close()
+        assert sample_counts(cvg)["top"] == 3
+
+    def test_write_error(self, tmp_path):
+        """Check a reading which fails to be written leaves the file unchanged"""
+
+        class FailingReading(PuppetReading):
+            def iter_bucket_hits(self, start=0, end=None):
+                raise RuntimeError("Failed to read")
+
+        cvg = Top()
+        cvg.sample("a")
+        path = tmp_path / "coverage.json"
+        JSONWriter(path).write(PointReader("").read(cvg))
+        before = path.read_text()
+        with pytest.raises(RuntimeError):
+            JSONWriter(path).write(FailingReading())
+        assert path.read_text() == before
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_iter_chunks(self):
+        assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(iter_chunks([], 2)) == []
@@ -22,6 +22,26 @@ type JSONData = {
     records: JSONRecord[],
 }
 
+type JSONRows = (string | number)[][];
+
+/**
+ * Find the first row (ordered by bucket start) with a bucket start of at least
+ * start, searching from lo. Buckets of sparse coverpoints only have rows if they
+ * were hit, so rows are found by their bucket start rather than position.
+ */
+function bisectStart(rows: JSONRows, column: number, start: number, lo: number=0): number {
+    let hi = rows.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if ((rows[mid][column] as number) < start) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
 
 export class JSONReading implements Reading {
     tables: JSONTables;
@@ -38,21 +58,26 @@ export class JSONReading implements Reading {
     get_rec_sha(): string {
         return this.record.sha;
     }
-    private *iter_def_table(table: string, start: number=0, end: number | null=null) {
+    private *iter_table(table: string, rows: JSONRows, start: number, end: number) {
         const keys = this.tables[table];
-        const tableDef = this.definition[table];
-        for (let idx=start; idx < (end ?? tableDef.length); idx++) {
-            const values = tableDef[idx];
+        for (let idx=start; idx < end; idx++) {
+            const values = rows[idx];
             yield Object.fromEntries(keys.map((k,i) => [k, values[i]]))
         }
     }
+    private *iter_def_table(table: string, start: number=0, end: number | null=null) {
+        const tableDef = this.definition[table];
+        yield *this.iter_table(table, tableDef, start, end ?? tableDef.length);
+    }
     private *iter_rec_table(table: string, start: number=0, end: number | null=null) {
-        const keys = this.tables[table];
-        const tableDef = this.record[table];
-        for (let idx=start; idx < (end ?? tableDef.length); idx++) {
-            const values = tableDef[idx];
-            yield Object.fromEntries(keys.map((k,i) => [k, values[i]]))
-        }
+        const tableRec = this.record[table];
+        yield *this.iter_table(table, tableRec, start, end ?? tableRec.length);
+    }
+    private *iter_bucket_table(table: string, rows: JSONRows, start: number, end: number | null) {
+        const column = this.tables[table].indexOf("start");
+        const first = bisectStart(rows, column, start);
+        const last = end === null ? rows.length : bisectStart(rows, column, end, first);
+        yield *this.iter_table(table, rows, first, last);
     }
     *iter_points(
         start: number=0,
@@ -67,7 +92,7 @@ export class JSONReading implements Reading {
         start: number=0,
         end: number | null=null,
     ): Generator<BucketGoalTuple> {
-        yield *this.iter_def_table("bucket_goal", start, end);
+        yield *this.iter_bucket_table("bucket_goal", this.definition["bucket_goal"], start, end);
     }
     *iter_axes(start: number, end: number | null): Generator<AxisTuple> {
         yield *this.iter_def_table("axis", start, end);
@@ -94,7 +119,7 @@ export class JSONReading implements Reading {
         start: number=0,
         end: number | null=null,
     ): Generator<BucketHitTuple> {
-        yield *this.iter_rec_table("bucket_hit", start, end);
+        yield *this.iter_bucket_table("bucket_hit", this.record["bucket_hit"], start, end);
     }
 }
 export class JSONReader implements Reader {